@@ -1,10 +1,11 @@
 """Application tracking endpoints."""
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.application import Application
 from app.models.job import Job
 
@@ -23,11 +24,11 @@ class ApplicationCreate(BaseModel):
 @router.post("/")
 async def create_application(
     application: ApplicationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new job application record."""
-    job = db.query(Job).filter(Job.id == application.job_id).first()
-    if not job:
+    job_id = await db.scalar(select(Job.id).where(Job.id == application.job_id))
+    if not job_id:
         raise HTTPException(404, "Job not found")
 
     app = Application(
@@ -41,8 +42,8 @@ async def create_application(
     )
 
     db.add(app)
-    db.commit()
-    db.refresh(app)
+    await db.commit()
+    await db.refresh(app)
 
     return {
         "application_id": app.id,
@@ -54,43 +55,59 @@ async def create_application(
 
 
 @router.get("/")
-async def list_applications(db: Session = Depends(get_db)):
+async def list_applications(db: AsyncSession = Depends(get_async_db)):
     """List all applications for user."""
     # TODO: Filter by authenticated user
-    applications = db.query(Application).all()
-
-    results = []
-    for app in applications:
-        job = db.query(Job).filter(Job.id == app.job_id).first()
-        results.append({
-            "application_id": app.id,
-            "job_id": app.job_id,
-            "job_title": job.title if job else "N/A",
-            "company": job.company if job else "N/A",
-            "status": app.status,
-            "applied_at": app.applied_at,
-            "auto_applied": app.auto_applied,
-            "notes": app.notes
-        })
+    # One outer join selecting only the listed columns
+    rows = (await db.execute(
+        select(
+            Application.id,
+            Application.job_id,
+            Application.status,
+            Application.applied_at,
+            Application.auto_applied,
+            Application.notes,
+            Job.title,
+            Job.company
+        ).outerjoin(Job, Job.id == Application.job_id)
+    )).all()
+
+    results = [
+        {
+            "application_id": row.id,
+            "job_id": row.job_id,
+            "job_title": row.title or "N/A",
+            "company": row.company or "N/A",
+            "status": row.status,
+            "applied_at": row.applied_at,
+            "auto_applied": row.auto_applied,
+            "notes": row.notes
+        }
+        for row in rows
+    ]
 
     return {"applications": results, "total": len(results)}
 
 
 @router.get("/{application_id}")
-async def get_application(application_id: int, db: Session = Depends(get_db)):
+async def get_application(application_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get detailed application information."""
-    app = db.query(Application).filter(Application.id == application_id).first()
-    if not app:
+    row = (await db.execute(
+        select(Application, Job.title, Job.company, Job.job_url).outerjoin(
+            Job, Job.id == Application.job_id
+        ).where(Application.id == application_id)
+    )).first()
+    if not row:
         raise HTTPException(404, "Application not found")
 
-    job = db.query(Job).filter(Job.id == app.job_id).first()
+    app = row.Application
 
     return {
         "application_id": app.id,
         "job_id": app.job_id,
-        "job_title": job.title if job else "N/A",
-        "company": job.company if job else "N/A",
-        "job_url": job.job_url if job else None,
+        "job_title": row.title or "N/A",
+        "company": row.company or "N/A",
+        "job_url": row.job_url,
         "status": app.status,
         "applied_at": app.applied_at,
         "tailored_resume": app.tailored_resume,
@@ -104,18 +121,18 @@ async def get_application(application_id: int, db: Session = Depends(get_db)):
 async def update_application_status(
     application_id: int,
     status: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update application status."""
     valid_statuses = ["pending", "submitted", "rejected", "interview", "offer"]
     if status not in valid_statuses:
         raise HTTPException(400, f"Invalid status. Must be one of: {valid_statuses}")
 
-    app = db.query(Application).filter(Application.id == application_id).first()
+    app = await db.get(Application, application_id)
     if not app:
         raise HTTPException(404, "Application not found")
 
     app.status = status
-    db.commit()
+    await db.commit()
 
     return {"application_id": app.id, "status": app.status}
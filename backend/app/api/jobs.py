@@ -1,14 +1,21 @@
 """Job management endpoints."""
+import base64
+import json
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.config import settings
+from app.database import SessionLocal, get_async_db
 from app.models.job import Job
 from app.scrapers.job_scraper import job_scraper
-from app.ml.embeddings import embedding_service
 from app.services.ai_job_discovery import AIJobDiscovery
+from app.services.job_ingest import upsert_jobs, embed_jobs
+from app.services.response_cache import response_cache
 
 router = APIRouter()
 
@@ -21,10 +28,7 @@ class JobSearchRequest(BaseModel):
 
 
 @router.post("/discover")
-async def discover_jobs_ai(
-    request: JobSearchRequest,
-    db: Session = Depends(get_db)
-):
+async def discover_jobs_ai(request: JobSearchRequest):
     """
     🤖 AI-POWERED Job Discovery (Recommended!)
 
@@ -42,25 +46,17 @@ async def discover_jobs_ai(
     }
     """
     try:
-        discovery = AIJobDiscovery(db)
-
-        jobs = discovery.discover_jobs(
-            search_term=request.search_term,
-            location=request.location,
-            max_results=request.results_wanted,
-            max_age_days=14  # Only last 2 weeks
-        )
-
-        # Save to database
-        added_count = 0
-        for job_data in jobs:
-            discovery._save_job_to_db(job_data)
-            added_count += 1
+        # The whole pipeline is blocking (scraping, validation, embedding), so
+        # it runs on a worker thread with its own session
+        result = await run_in_threadpool(_discover, request)
 
         return {
             "message": "AI job discovery completed",
-            "jobs_found": len(jobs),
-            "added_to_database": added_count,
+            "jobs_found": result["inserted"] + result["updated"] + result["unchanged"],
+            "added_to_database": result["inserted"],
+            "embedded": result["embedded"],
+            "rejected": result["rejected"],
+            "stages": result["stages"],
             "quality_filter": "Only fresh, legitimate, high-quality jobs"
         }
 
@@ -68,11 +64,25 @@ async def discover_jobs_ai(
         raise HTTPException(500, f"AI discovery error: {str(e)}")
 
 
+def _discover(request: JobSearchRequest) -> Dict:
+    """Run the discovery pipeline on a sync session (called off the event loop)."""
+    db = SessionLocal()
+    try:
+        discovery = AIJobDiscovery(db)
+
+        # Fetch, validate, dedupe, save and embed as one streaming pipeline
+        return discovery.ingest_jobs(
+            search_term=request.search_term,
+            location=request.location,
+            max_results=request.results_wanted,
+            max_age_days=14  # Only last 2 weeks
+        )
+    finally:
+        db.close()
+
+
 @router.post("/scrape")
-async def scrape_jobs(
-    request: JobSearchRequest,
-    db: Session = Depends(get_db)
-):
+async def scrape_jobs(request: JobSearchRequest):
     """
     Basic job scraping (fallback method).
 
@@ -85,6 +95,26 @@ async def scrape_jobs(
         "results_wanted": 50
     }
     """
+    try:
+        # Scraping, MinHash dedupe and embedding all block, so they run on a
+        # worker thread with their own session
+        jobs_data, result = await run_in_threadpool(_scrape, request)
+
+        return {
+            "message": "Jobs scraped successfully",
+            "added": result["inserted"],
+            "updated": result["updated"],
+            "unchanged": result["unchanged"],
+            "total": len(jobs_data)
+        }
+
+    except Exception as e:
+        raise HTTPException(500, f"Error scraping jobs: {str(e)}")
+
+
+def _scrape(request: JobSearchRequest) -> Tuple[List[Dict], Dict]:
+    """Scrape, upsert and embed on a sync session (called off the event loop)."""
+    db = SessionLocal()
     try:
         # Scrape jobs
         jobs_data = job_scraper.scrape(
@@ -93,79 +123,142 @@ async def scrape_jobs(
             results_wanted=request.results_wanted
         )
 
-        added_count = 0
-        updated_count = 0
-
-        for job_data in jobs_data:
-            # Check if job already exists
-            existing = db.query(Job).filter(
-                Job.external_id == job_data["external_id"]
-            ).first()
-
-            if existing:
-                # Update existing job
-                for key, value in job_data.items():
-                    setattr(existing, key, value)
-                updated_count += 1
-            else:
-                # Create new job
-                job = Job(**job_data)
-                db.add(job)
-                added_count += 1
-
+        result = upsert_jobs(db, jobs_data)
         db.commit()
 
-        # Generate embeddings for new jobs (async in production)
-        new_jobs = db.query(Job).filter(Job.embedding_id == None).limit(100).all()
-        for job in new_jobs:
-            try:
-                embedding_id = embedding_service.store_job_embedding(
-                    job_id=job.id,
-                    text=job.description,
-                    metadata={
-                        "title": job.title,
-                        "company": job.company,
-                        "location": job.location
-                    }
-                )
-                job.embedding_id = embedding_id
-                db.commit()
-            except Exception as e:
-                print(f"Error generating embedding for job {job.id}: {e}")
-
-        return {
-            "message": "Jobs scraped successfully",
-            "added": added_count,
-            "updated": updated_count,
-            "total": len(jobs_data)
-        }
+        # Generate embeddings for new and changed jobs (async in production)
+        try:
+            embed_jobs(db, result["needs_embedding"])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error generating embeddings for {len(result['needs_embedding'])} jobs: {e}")
 
-    except Exception as e:
+        return jobs_data, result
+    except Exception:
         db.rollback()
-        raise HTTPException(500, f"Error scraping jobs: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+def _encode_cursor(posted_date: Optional[datetime], job_id: int) -> str:
+    """Opaque keyset cursor for the last job of a page."""
+    payload = json.dumps([posted_date.isoformat() if posted_date else None, job_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        posted_date, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(posted_date) if posted_date else None), int(job_id)
+    except (ValueError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+async def _page_after(
+    db: AsyncSession,
+    page,
+    posted_date: Optional[datetime],
+    job_id: int,
+    limit: int
+) -> List:
+    """
+    Rows after a cursor in (posted_date DESC NULLS LAST, id DESC) order.
+
+    Each query is a single range seek on ix_jobs_feed_order: dated rows
+    after the cursor first, then undated rows only if the page isn't full.
+    One OR of both conditions can't be an index condition, so Postgres
+    would filter rows from the start of the index instead.
+    """
+    if posted_date is None:
+        return (await db.execute(page.where(Job.posted_date == None, Job.id < job_id).limit(limit))).all()
+
+    jobs = (await db.execute(
+        page.where(tuple_(Job.posted_date, Job.id) < tuple_(posted_date, job_id)).limit(limit)
+    )).all()
+    if len(jobs) < limit:
+        jobs += (await db.execute(page.where(Job.posted_date == None).limit(limit - len(jobs)))).all()
+    return jobs
+
+
+async def _cached_count(db: AsyncSession, query, search: Optional[str]) -> int:
+    """
+    Total for a search, shared across workers through the response cache.
+
+    It lives in the "jobs" namespace, so the same ingest that invalidates
+    the cached pages invalidates the count.
+    """
+    params = {"count": True, "search": search}
+    total, generation = await response_cache.get("jobs", params)
+    if total is not None:
+        return total
+
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    await response_cache.set(
+        "jobs", params, total, settings.JOB_COUNT_CACHE_SECONDS, generation=generation
+    )
+    return total
 
 
 @router.get("/")
 async def list_jobs(
+    cursor: Optional[str] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List jobs with pagination and optional search."""
-    query = db.query(Job).filter(Job.is_active == True)
+    """
+    List jobs, newest first, with optional search.
+
+    Pass the returned next_cursor to fetch the following page; keyset
+    pagination on (posted_date, id) costs the same on every page, unlike
+    skip, which is kept for compatibility. Search matches title or company
+    substrings through trigram indexes. total is cached for
+    JOB_COUNT_CACHE_SECONDS and whole pages for JOB_LIST_CACHE_TTL, both
+    until the next job ingest at the latest.
+    """
+    params = {"cursor": cursor, "skip": skip, "limit": limit, "search": search}
+    cached, generation = await response_cache.get("jobs", params)
+    if cached is not None:
+        return cached
+
+    # Near-duplicates are listed through their canonical job only
+    filters = [Job.is_active == True, Job.canonical_job_id == None]
 
     if search:
-        query = query.filter(
+        filters.append(
             (Job.title.ilike(f"%{search}%")) |
             (Job.company.ilike(f"%{search}%"))
         )
 
-    total = query.count()
-    jobs = query.offset(skip).limit(limit).all()
-
-    return {
+    total = await _cached_count(db, select(Job.id).where(*filters), search)
+
+    page = select(
+        Job.id,
+        Job.title,
+        Job.company,
+        Job.location,
+        Job.job_type,
+        Job.experience_level,
+        Job.posted_date,
+        Job.job_url,
+        Job.source
+    ).where(*filters).order_by(Job.posted_date.desc().nulls_last(), Job.id.desc())
+
+    if cursor:
+        jobs = await _page_after(db, page, *_decode_cursor(cursor), limit)
+    else:
+        if skip:
+            page = page.offset(skip)
+        jobs = (await db.execute(page.limit(limit))).all()
+
+    response = {
         "total": total,
+        "next_cursor": (
+            _encode_cursor(jobs[-1].posted_date, jobs[-1].id) if len(jobs) == limit else None
+        ),
         "jobs": [
             {
                 "id": job.id,
@@ -181,17 +274,24 @@ async def list_jobs(
             for job in jobs
         ]
     }
+    return await response_cache.set(
+        "jobs", params, response, settings.JOB_LIST_CACHE_TTL, generation=generation
+    )
 
 
 @router.get("/{job_id}")
-async def get_job(job_id: int, db: Session = Depends(get_db)):
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get detailed job information."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    cached, generation = await response_cache.get("job", {}, scope=job_id)
+    if cached is not None:
+        return cached
+
+    job = await db.get(Job, job_id)
 
     if not job:
         raise HTTPException(404, "Job not found")
 
-    return {
+    response = {
         "id": job.id,
         "title": job.title,
         "company": job.company,
@@ -208,3 +308,6 @@ async def get_job(job_id: int, db: Session = Depends(get_db)):
         "source": job.source,
         "posted_date": job.posted_date,
     }
+    return await response_cache.set(
+        "job", {}, response, settings.JOB_DETAIL_CACHE_TTL, scope=job_id, generation=generation
+    )
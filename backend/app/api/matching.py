@@ -1,15 +1,22 @@
 """Job matching endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.concurrency import run_cpu
+from app.config import settings
+from app.database import get_async_db
 from app.models.resume import Resume
 from app.models.job import Job
 from app.models.match_score import MatchScore
 from app.ml.matching import matching_engine
+from app.ml.embeddings import embedding_service
 from app.services.resume_tailor import resume_tailor_service
+from app.services.match_scores import upsert_match_score, upsert_match_scores
+from app.services.response_cache import commit_and_invalidate, response_cache
 
 router = APIRouter()
 
@@ -24,7 +31,7 @@ class TailorRequest(BaseModel):
 async def calculate_match(
     resume_id: int,
     job_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Calculate match score between a resume and job.
@@ -32,8 +39,8 @@ async def calculate_match(
     Returns detailed matching analysis with score breakdown.
     """
     # Get resume and job
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
-    job = db.query(Job).filter(Job.id == job_id).first()
+    resume = await db.get(Resume, resume_id)
+    job = await db.get(Job, job_id)
 
     if not resume:
         raise HTTPException(404, "Resume not found")
@@ -46,6 +53,7 @@ async def calculate_match(
         "skills": resume.skills or [],
         "experience_years": resume.experience_years,
         "education": resume.education or [],
+        "embedding_id": resume.embedding_id,
         "location": "",  # TODO: Extract from parsed data
     }
 
@@ -54,48 +62,15 @@ async def calculate_match(
         "required_skills": job.required_skills or [],
         "experience_level": job.experience_level or "mid",
         "location": job.location or "",
+        "embedding_id": job.embedding_id,
     }
 
     # Calculate match
-    match_result = matching_engine.match_resume_to_job(resume_data, job_data)
+    match_result = await run_cpu(matching_engine.match_resume_to_job, resume_data, job_data)
 
-    # Check if match score already exists
-    existing_match = db.query(MatchScore).filter(
-        MatchScore.resume_id == resume_id,
-        MatchScore.job_id == job_id
-    ).first()
-
-    if existing_match:
-        # Update existing
-        existing_match.overall_score = match_result["overall_score"]
-        existing_match.keyword_score = match_result["keyword_score"]
-        existing_match.semantic_score = match_result["semantic_score"]
-        existing_match.experience_score = match_result["experience_score"]
-        existing_match.education_score = match_result["education_score"]
-        existing_match.location_score = match_result["location_score"]
-        existing_match.matched_skills = match_result["matched_skills"]
-        existing_match.missing_skills = match_result["missing_skills"]
-        existing_match.strengths = match_result["strengths"]
-        existing_match.gaps = match_result["gaps"]
-    else:
-        # Create new
-        match_score = MatchScore(
-            resume_id=resume_id,
-            job_id=job_id,
-            overall_score=match_result["overall_score"],
-            keyword_score=match_result["keyword_score"],
-            semantic_score=match_result["semantic_score"],
-            experience_score=match_result["experience_score"],
-            education_score=match_result["education_score"],
-            location_score=match_result["location_score"],
-            matched_skills=match_result["matched_skills"],
-            missing_skills=match_result["missing_skills"],
-            strengths=match_result["strengths"],
-            gaps=match_result["gaps"],
-        )
-        db.add(match_score)
-
-    db.commit()
+    # Insert or update atomically
+    await db.run_sync(upsert_match_score, resume_id, job_id, match_result)
+    await commit_and_invalidate(db)
 
     return {
         "resume_id": resume_id,
@@ -111,51 +86,162 @@ async def get_matches_for_resume(
     resume_id: int,
     min_score: float = Query(0, ge=0, le=100),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all job matches for a resume, sorted by match score.
 
-    Optionally filter by minimum score.
+    Optionally filter by minimum score. Responses are cached until a
+    match score of the resume changes.
     """
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
-    if not resume:
+    params = {"min_score": min_score, "limit": limit}
+    cached, generation = await response_cache.get("matches", params, scope=resume_id)
+    if cached is not None:
+        return cached
+
+    if not await db.scalar(select(Resume.id).where(Resume.id == resume_id)):
         raise HTTPException(404, "Resume not found")
 
-    # Get existing match scores
-    matches = db.query(MatchScore).filter(
+    # Get existing match scores with their jobs in one joined query
+    rows = (await db.execute(select(
+        MatchScore.overall_score,
+        MatchScore.matched_skills,
+        MatchScore.missing_skills,
+        MatchScore.strengths,
+        MatchScore.gaps,
+        Job.id,
+        Job.title,
+        Job.company,
+        Job.location,
+        Job.job_url
+    ).join(Job, Job.id == MatchScore.job_id).where(
         MatchScore.resume_id == resume_id,
         MatchScore.overall_score >= min_score
-    ).order_by(MatchScore.overall_score.desc()).limit(limit).all()
+    ).order_by(MatchScore.overall_score.desc()).limit(limit))).all()
+
+    results = [
+        {
+            "job_id": row.id,
+            "title": row.title,
+            "company": row.company,
+            "location": row.location,
+            "job_url": row.job_url,
+            "overall_score": row.overall_score,
+            "matched_skills": row.matched_skills,
+            "missing_skills": row.missing_skills,
+            "strengths": row.strengths,
+            "gaps": row.gaps,
+        }
+        for row in rows
+    ]
+
+    response = {
+        "resume_id": resume_id,
+        "matches": results,
+        "total": len(results)
+    }
+    return await response_cache.set(
+        "matches", params, response, settings.MATCHES_CACHE_TTL, scope=resume_id, generation=generation
+    )
+
+
+def _retrieve_candidates(
+    embedding_id: Optional[str],
+    raw_text: str,
+    limit: int
+) -> List[Dict[str, Any]]:
+    """Nearest jobs to a resume's stored vector (embedded on the fly if missing)."""
+    vectors = embedding_service.get_vectors([embedding_id]) if embedding_id else {}
+    resume_vector = vectors.get(embedding_id)
+    if resume_vector is None:
+        resume_vector = embedding_service.generate_embedding(raw_text)
+
+    return embedding_service.search_similar_jobs_by_vector(resume_vector, limit=limit)
+
+
+@router.get("/recommend/{resume_id}")
+async def recommend_jobs(
+    resume_id: int,
+    candidates: int = Query(200, ge=1, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+    persist: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Recommend jobs for a resume.
+
+    Two stages: retrieve the top `candidates` jobs from Qdrant using the
+    resume's stored vector, then rerank them with the full MatchingEngine
+    weighting and return the best `limit`. With `persist=true` the scores
+    are also written to match_scores.
+    """
+    resume = await db.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(404, "Resume not found")
 
-    results = []
-    for match in matches:
-        job = db.query(Job).filter(Job.id == match.job_id).first()
-        if job:
-            results.append({
+    # Stage 1: vector retrieval
+    hits = await run_cpu(_retrieve_candidates, resume.embedding_id, resume.raw_text, candidates)
+    job_ids = list(dict.fromkeys(hit["job_id"] for hit in hits if hit["job_id"] is not None))
+    if not job_ids:
+        return {"resume_id": resume_id, "matches": [], "total": 0, "candidates": 0}
+
+    jobs = (await db.scalars(select(Job).where(
+        Job.id.in_(job_ids),
+        Job.is_active == True,
+        Job.canonical_job_id == None
+    ))).all()
+
+    # Stage 2: rerank with full scoring
+    resume_data = {
+        "raw_text": resume.raw_text,
+        "skills": resume.skills or [],
+        "experience_years": resume.experience_years,
+        "education": resume.education or [],
+        "embedding_id": resume.embedding_id,
+        "location": "",  # TODO: Extract from parsed data
+    }
+
+    jobs_data = [
+        {
+            "description": job.description,
+            "required_skills": job.required_skills or [],
+            "experience_level": job.experience_level or "mid",
+            "location": job.location or "",
+            "embedding_id": job.embedding_id,
+        }
+        for job in jobs
+    ]
+    ranked = await run_cpu(matching_engine.match_resume_to_jobs, resume_data, jobs_data, top_n=limit)
+    top = [(jobs[idx], match_result) for idx, match_result in ranked]
+
+    if persist and top:
+        await db.run_sync(upsert_match_scores, [
+            (resume_id, job.id, match_result) for job, match_result in top
+        ])
+        await commit_and_invalidate(db)
+
+    return {
+        "resume_id": resume_id,
+        "matches": [
+            {
                 "job_id": job.id,
                 "title": job.title,
                 "company": job.company,
                 "location": job.location,
                 "job_url": job.job_url,
-                "overall_score": match.overall_score,
-                "matched_skills": match.matched_skills,
-                "missing_skills": match.missing_skills,
-                "strengths": match.strengths,
-                "gaps": match.gaps,
-            })
-
-    return {
-        "resume_id": resume_id,
-        "matches": results,
-        "total": len(results)
+                **match_result
+            }
+            for job, match_result in top
+        ],
+        "total": len(top),
+        "candidates": len(jobs)
     }
 
 
 @router.post("/tailor")
 async def tailor_resume(
     request: TailorRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate tailoring suggestions for a resume to match a specific job.
@@ -165,8 +251,8 @@ async def tailor_resume(
     - Bullet point rewrites
     - Overall strategy
     """
-    resume = db.query(Resume).filter(Resume.id == request.resume_id).first()
-    job = db.query(Job).filter(Job.id == request.job_id).first()
+    resume = await db.get(Resume, request.resume_id)
+    job = await db.get(Job, request.job_id)
 
     if not resume:
         raise HTTPException(404, "Resume not found")
@@ -174,10 +260,10 @@ async def tailor_resume(
         raise HTTPException(404, "Job not found")
 
     # Get or calculate match score
-    match = db.query(MatchScore).filter(
+    match = await db.scalar(select(MatchScore).where(
         MatchScore.resume_id == request.resume_id,
         MatchScore.job_id == request.job_id
-    ).first()
+    ))
 
     if not match:
         # Calculate match first
@@ -186,13 +272,15 @@ async def tailor_resume(
             "skills": resume.skills or [],
             "experience_years": resume.experience_years,
             "education": resume.education or [],
+            "embedding_id": resume.embedding_id,
         }
         job_data = {
             "description": job.description,
             "required_skills": job.required_skills or [],
             "experience_level": job.experience_level or "mid",
+            "embedding_id": job.embedding_id,
         }
-        match_result = matching_engine.match_resume_to_job(resume_data, job_data)
+        match_result = await run_cpu(matching_engine.match_resume_to_job, resume_data, job_data)
 
         matched_skills = match_result["matched_skills"]
         missing_skills = match_result["missing_skills"]
@@ -201,17 +289,23 @@ async def tailor_resume(
         missing_skills = match.missing_skills or []
 
     # Generate tailoring suggestions
-    suggestions = resume_tailor_service.generate_tailoring_suggestions(
+    suggestions = await run_in_threadpool(
+        resume_tailor_service.generate_tailoring_suggestions,
         resume_text=resume.raw_text,
         job_description=job.description,
         missing_skills=missing_skills,
         matched_skills=matched_skills
     )
 
-    # Store suggestions in match_score
+    # Store suggestions, saving the match score too if it was computed here
     if match:
         match.suggestions = suggestions
-        db.commit()
+    else:
+        await db.run_sync(
+            upsert_match_score, request.resume_id, request.job_id,
+            {**match_result, "suggestions": suggestions}
+        )
+    await commit_and_invalidate(db)
 
     return {
         "resume_id": request.resume_id,
@@ -227,25 +321,26 @@ async def tailor_resume(
 @router.post("/generate-tailored-resume")
 async def generate_tailored_resume(
     request: TailorRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate a fully tailored resume for a specific job."""
-    resume = db.query(Resume).filter(Resume.id == request.resume_id).first()
-    job = db.query(Job).filter(Job.id == request.job_id).first()
+    resume = await db.get(Resume, request.resume_id)
+    job = await db.get(Job, request.job_id)
 
     if not resume or not job:
         raise HTTPException(404, "Resume or job not found")
 
     # Get match and suggestions
-    match = db.query(MatchScore).filter(
+    match = await db.scalar(select(MatchScore).where(
         MatchScore.resume_id == request.resume_id,
         MatchScore.job_id == request.job_id
-    ).first()
+    ))
 
     suggestions = match.suggestions if match and match.suggestions else {}
 
     # Generate tailored resume
-    tailored_resume = resume_tailor_service.generate_tailored_resume(
+    tailored_resume = await run_in_threadpool(
+        resume_tailor_service.generate_tailored_resume,
         resume_text=resume.raw_text,
         job_description=job.description,
         suggestions=suggestions
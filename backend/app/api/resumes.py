@@ -1,90 +1,313 @@
 """Resume management endpoints."""
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from celery.result import AsyncResult
 from pathlib import Path
-import shutil
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import time
+import zipfile
+from typing import List, Tuple
 
-from app.database import get_db
+from app.concurrency import run_cpu
+from app.database import get_async_db
 from app.models.resume import Resume
-from app.services.resume_parser import resume_parser
+from app.services.resume_parser import init_parse_worker, parse_resume_batch
+from app.services.resume_ingest import (
+    UploadTooLargeError,
+    store_upload,
+    find_parsed_resume,
+    find_parsed_resumes,
+    build_resume,
+    reuse_parsed_resume,
+)
 from app.ml.embeddings import embedding_service
+from app.celery_app import celery_app, process_resume_task
 from app.config import settings
 
 router = APIRouter()
 
+ALLOWED_EXTENSIONS = [".pdf", ".docx", ".doc", ".txt"]
 
-@router.post("/upload")
+
+def _resume_summary(resume: Resume) -> dict:
+    """Task-style result for a resume that needs no processing."""
+    return {
+        "status": "success",
+        "resume_id": resume.id,
+        "filename": resume.filename,
+        "parsed_data": resume.parsed_data
+    }
+
+
+@router.post("/upload", status_code=202)
 async def upload_resume(
+    response: Response,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Upload and parse resume.
+    Upload a resume for background parsing.
 
-    Returns parsed resume data with skills, experience, etc.
+    The file is stored under its content hash. Re-uploads of a file that
+    was already parsed reuse the existing result and return 200 right away;
+    otherwise a Celery task parses, stores and embeds it. Poll
+    GET /api/resumes/tasks/{task_id} for the parsed result.
     """
     # Validate file type
-    allowed_extensions = [".pdf", ".docx", ".doc", ".txt"]
     file_extension = Path(file.filename).suffix.lower()
 
-    if file_extension not in allowed_extensions:
-        raise HTTPException(400, f"Unsupported file type. Allowed: {allowed_extensions}")
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(400, f"Unsupported file type. Allowed: {ALLOWED_EXTENSIONS}")
 
     # Save file
-    upload_dir = Path(settings.UPLOAD_DIR)
-    upload_dir.mkdir(exist_ok=True)
-
-    file_path = upload_dir / file.filename
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
     try:
-        # Parse resume
-        parsed_data = resume_parser.parse_resume(str(file_path))
-
-        # Create resume record (using user_id=1 for demo)
-        resume = Resume(
-            user_id=1,  # TODO: Get from auth
-            filename=file.filename,
-            file_path=str(file_path),
-            raw_text=parsed_data["raw_text"],
-            parsed_data=parsed_data,
-            skills=parsed_data.get("skills", []),
-            experience_years=parsed_data.get("experience_years"),
-            education=parsed_data.get("education", []),
-        )
-
-        db.add(resume)
-        db.commit()
-        db.refresh(resume)
-
-        # Generate and store embedding
-        embedding_id = embedding_service.store_resume_embedding(
-            resume_id=resume.id,
-            text=parsed_data["raw_text"],
-            metadata={"filename": file.filename}
-        )
-
-        resume.embedding_id = embedding_id
-        db.commit()
+        file_path, file_hash = await run_in_threadpool(store_upload, file.file, file.filename)
+    except UploadTooLargeError as e:
+        raise HTTPException(413, str(e))
+
+    user_id = 1  # TODO: Get from auth
 
+    cached = await db.run_sync(find_parsed_resume, file_hash)
+    if cached:
+        resume = await db.run_sync(reuse_parsed_resume, cached, user_id, file.filename)
+        await db.commit()
+        response.status_code = 200
         return {
-            "resume_id": resume.id,
+            "task_id": None,
             "filename": file.filename,
-            "parsed_data": parsed_data,
-            "message": "Resume uploaded and parsed successfully"
+            "status": "completed",
+            "result": _resume_summary(resume),
+            "message": "Identical resume already parsed; reused existing result"
         }
 
+    task = await run_in_threadpool(
+        process_resume_task.delay,
+        file_path=str(file_path),
+        filename=file.filename,
+        user_id=user_id,
+        file_hash=file_hash
+    )
+
+    return {
+        "task_id": task.id,
+        "filename": file.filename,
+        "status": "queued",
+        "status_url": f"/api/resumes/tasks/{task.id}",
+        "message": "Resume uploaded and queued for processing"
+    }
+
+
+@router.get("/tasks/{task_id}")
+async def get_resume_task(task_id: str):
+    """Get the status of a resume processing task."""
+    # Reading task state is a blocking round trip to the result backend
+    return await run_in_threadpool(_task_status, task_id)
+
+
+def _task_status(task_id: str) -> dict:
+    """Map a Celery task state to the upload status response."""
+    task = AsyncResult(task_id, app=celery_app)
+
+    response = {"task_id": task_id}
+
+    if task.state == "SUCCESS":
+        result = task.result or {}
+        if result.get("status") == "error":
+            response.update({"status": "failed", "error": result.get("message")})
+        else:
+            response.update({"status": "completed", "result": result})
+    elif task.state == "FAILURE":
+        response.update({"status": "failed", "error": str(task.result)})
+    elif task.state in ("STARTED", "PROGRESS"):
+        meta = task.info if isinstance(task.info, dict) else {}
+        response.update({"status": "processing", "stage": meta.get("stage")})
+    else:
+        response["status"] = "queued"
+
+    return response
+
+
+def _count_bulk_entries(files: List[UploadFile]) -> int:
+    """Number of files in an import, counting the members of zip archives."""
+    count = 0
+    for file in files:
+        if Path(file.filename).suffix.lower() != ".zip":
+            count += 1
+            continue
+        try:
+            with zipfile.ZipFile(file.file) as archive:
+                count += sum(1 for info in archive.infolist() if not info.is_dir())
+        except zipfile.BadZipFile:
+            count += 1
+        file.file.seek(0)
+    return count
+
+
+def _save_bulk_files(files: List[UploadFile]) -> Tuple[List[Tuple[str, Path, str]], List[dict]]:
+    """
+    Save uploaded resumes (expanding zip archives) under their content hash.
+
+    Returns:
+        ([(original filename, saved path, file hash)], [per-file rejection results])
+    """
+    saved = []
+    rejected = []
+
+    def save(filename: str, source):
+        name = Path(filename).name
+        if Path(name).suffix.lower() not in ALLOWED_EXTENSIONS:
+            rejected.append({"filename": filename, "status": "rejected", "error": "Unsupported file type"})
+            return
+        try:
+            file_path, file_hash = store_upload(source, name)
+        except UploadTooLargeError:
+            rejected.append({"filename": filename, "status": "rejected", "error": "File too large"})
+            return
+        saved.append((name, file_path, file_hash))
+
+    for file in files:
+        if Path(file.filename).suffix.lower() == ".zip":
+            try:
+                with zipfile.ZipFile(file.file) as archive:
+                    for info in archive.infolist():
+                        if info.is_dir():
+                            continue
+                        if info.file_size > settings.MAX_UPLOAD_SIZE:
+                            rejected.append({"filename": info.filename, "status": "rejected", "error": "File too large"})
+                            continue
+                        with archive.open(info) as member:
+                            save(info.filename, member)
+            except zipfile.BadZipFile:
+                rejected.append({"filename": file.filename, "status": "rejected", "error": "Invalid zip archive"})
+        else:
+            save(file.filename, file.file)
+
+    return saved, rejected
+
+
+@router.post("/bulk")
+async def bulk_upload_resumes(
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk import resumes from many files and/or zip archives.
+
+    Files are parsed in a process pool, inserted in bulk and embedded in
+    batches. Files identical to an already parsed resume (or to another
+    file in the same import) are not parsed again. Returns per-file status
+    and throughput.
+    """
+    start = time.perf_counter()
+    user_id = 1  # TODO: Get from auth
+
+    # Reject oversized imports before anything is written to disk
+    if await run_in_threadpool(_count_bulk_entries, files) > settings.MAX_BULK_FILES:
+        raise HTTPException(400, f"Too many files. Maximum per import: {settings.MAX_BULK_FILES}")
+
+    saved, results = await run_in_threadpool(_save_bulk_files, files)
+
+    # Only parse each distinct, not yet parsed file once
+    cached = await db.run_sync(find_parsed_resumes, [file_hash for _, _, file_hash in saved])
+    to_parse = {}
+    for filename, file_path, file_hash in saved:
+        if file_hash not in cached and file_hash not in to_parse:
+            to_parse[file_hash] = (filename, file_path)
+
+    # Parse in worker processes, one chunk of files per task
+    paths = [str(file_path) for _, file_path in to_parse.values()]
+    chunk_size = settings.BULK_PARSE_CHUNK_SIZE
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+
+    parsed = []
+    if chunks:
+        loop = asyncio.get_running_loop()
+        # Spawn, not fork: this process runs threads (executors, warm-up) whose
+        # locks a forked child could inherit held
+        with ProcessPoolExecutor(
+            max_workers=settings.BULK_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_parse_worker
+        ) as pool:
+            chunk_results = await asyncio.gather(*[
+                loop.run_in_executor(pool, parse_resume_batch, chunk) for chunk in chunks
+            ])
+        parsed = [item for chunk in chunk_results for item in chunk]
+    parse_seconds = time.perf_counter() - start
+
+    # Bulk insert successfully parsed resumes
+    new_resumes = {}
+    failed = {}
+    for (file_hash, (filename, file_path)), parsed_data in zip(to_parse.items(), parsed):
+        if "error" in parsed_data:
+            failed[file_hash] = parsed_data["error"]
+            continue
+        new_resumes[file_hash] = build_resume(user_id, filename, str(file_path), file_hash, parsed_data)
+
+    try:
+        db.add_all(new_resumes.values())
+        await db.flush()
+
+        # Embed in batches
+        try:
+            embedding_ids = await run_cpu(embedding_service.store_resume_embeddings, [
+                {"resume_id": r.id, "text": r.raw_text, "metadata": {"filename": r.filename}}
+                for r in new_resumes.values()
+            ])
+            for resume, embedding_id in zip(new_resumes.values(), embedding_ids):
+                resume.embedding_id = embedding_id
+        except Exception as e:
+            print(f"Error generating embeddings for bulk import: {e}")
+
+        # Reuse earlier parses of identical files
+        reused = {}
+        for filename, _, file_hash in saved:
+            if file_hash in cached and file_hash not in reused:
+                reused[file_hash] = await db.run_sync(
+                    reuse_parsed_resume, cached[file_hash], user_id, filename
+                )
+
+        await db.commit()
     except Exception as e:
-        db.rollback()
-        raise HTTPException(500, f"Error processing resume: {str(e)}")
+        await db.rollback()
+        raise HTTPException(500, f"Error saving resumes: {str(e)}")
+
+    imported = 0
+    reported = set()
+    for filename, _, file_hash in saved:
+        if file_hash in failed:
+            results.append({"filename": filename, "status": "failed", "error": failed[file_hash]})
+        elif file_hash in reported:
+            resume = new_resumes.get(file_hash) or reused[file_hash]
+            results.append({"filename": filename, "status": "duplicate", "resume_id": resume.id})
+        elif file_hash in new_resumes:
+            results.append({"filename": filename, "status": "imported", "resume_id": new_resumes[file_hash].id})
+            imported += 1
+        else:
+            results.append({"filename": filename, "status": "reused", "resume_id": reused[file_hash].id})
+        reported.add(file_hash)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "total": len(results),
+        "imported": imported,
+        "reused": sum(1 for r in results if r["status"] in ("reused", "duplicate")),
+        "failed": sum(1 for r in results if r["status"] in ("failed", "rejected")),
+        "parse_seconds": round(parse_seconds, 2),
+        "elapsed_seconds": round(elapsed, 2),
+        "resumes_per_second": round(len(saved) / elapsed, 2) if elapsed else None,
+        "results": results
+    }
 
 
 @router.get("/{resume_id}")
-async def get_resume(resume_id: int, db: Session = Depends(get_db)):
+async def get_resume(resume_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get resume by ID."""
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
+    resume = await db.get(Resume, resume_id)
 
     if not resume:
         raise HTTPException(404, "Resume not found")
@@ -101,10 +324,16 @@ async def get_resume(resume_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-async def list_resumes(db: Session = Depends(get_db)):
+async def list_resumes(db: AsyncSession = Depends(get_async_db)):
     """List all resumes for user."""
     # TODO: Filter by authenticated user
-    resumes = db.query(Resume).all()
+    resumes = (await db.execute(select(
+        Resume.id,
+        Resume.filename,
+        Resume.skills,
+        Resume.experience_years,
+        Resume.created_at
+    ))).all()
 
     return [
         {
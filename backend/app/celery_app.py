@@ -1,5 +1,6 @@
 """Celery application for background tasks."""
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 from app.config import settings
 
 celery_app = Celery(
@@ -14,47 +15,56 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    task_track_started=True,
 )
 
 
+@worker_init.connect
+def preload_worker_models(**kwargs):
+    """Load models once in the parent so prefork children share them."""
+    from app.warmup import preload_models
+    try:
+        preload_models()
+    except Exception as e:
+        print(f"⚠️ Model preload failed: {e}")
+
+
+@worker_process_init.connect
+def warm_up_worker_process(**kwargs):
+    """Open per-process clients in each forked worker."""
+    from app.warmup import warm_up_services
+    warm_up_services()
+
+
 @celery_app.task
 def scrape_jobs_task(search_term: str, location: str = "", results_wanted: int = 20):
     """Background task to scrape jobs."""
     from app.scrapers.job_scraper import job_scraper
     from app.database import SessionLocal
-    from app.models.job import Job
-    from app.ml.embeddings import embedding_service
+    from app.services.job_ingest import upsert_jobs, embed_jobs, jobs_missing_embeddings
 
     db = SessionLocal()
     try:
-        jobs_data = job_scraper.scrape(
+        # Only fetch postings newer than this query's last run
+        jobs_data = job_scraper.scrape_incremental(
+            db,
             search_term=search_term,
             location=location,
             results_wanted=results_wanted
         )
 
-        for job_data in jobs_data:
-            existing = db.query(Job).filter(
-                Job.external_id == job_data["external_id"]
-            ).first()
-
-            if not existing:
-                job = Job(**job_data)
-                db.add(job)
-                db.flush()
-
-                # Generate embedding
-                try:
-                    embedding_id = embedding_service.store_job_embedding(
-                        job_id=job.id,
-                        text=job.description,
-                        metadata={"title": job.title, "company": job.company}
-                    )
-                    job.embedding_id = embedding_id
-                except Exception as e:
-                    print(f"Error generating embedding: {e}")
-
+        result = upsert_jobs(db, jobs_data)
         db.commit()
+
+        # Generate embeddings in batches, back-filling jobs a failed run left
+        # without one (the cursor won't offer them again)
+        try:
+            embed_jobs(db, list(dict.fromkeys(result["needs_embedding"] + jobs_missing_embeddings(db))))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error generating embeddings: {e}")
+
         return {"status": "success", "jobs_scraped": len(jobs_data)}
 
     except Exception as e:
@@ -64,6 +74,98 @@ def scrape_jobs_task(search_term: str, location: str = "", results_wanted: int =
         db.close()
 
 
+@celery_app.task
+def backfill_near_duplicates_task(batch_size: int = 500):
+    """
+    One-off: MinHash, link and bucket jobs stored before near-duplicate
+    detection existed. Safe to re-run; only jobs without a MinHash are read.
+    """
+    from app.database import SessionLocal
+    from app.services.near_duplicates import near_duplicate_index
+
+    db = SessionLocal()
+    try:
+        last_id, processed, linked = 0, 0, 0
+        while True:
+            result = near_duplicate_index.backfill_batch(db, after_id=last_id, batch_size=batch_size)
+            db.commit()
+            if not result["processed"]:
+                break
+            last_id = result["last_id"]
+            processed += result["processed"]
+            linked += result["linked"]
+
+        return {"status": "success", "processed": processed, "linked": linked}
+
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True)
+def process_resume_task(
+    self,
+    file_path: str,
+    filename: str,
+    user_id: int = 1,
+    file_hash: str = None
+):
+    """Background task to parse, store and embed an uploaded resume."""
+    from app.services.resume_parser import resume_parser
+    from app.services.resume_ingest import build_resume, find_parsed_resume, reuse_parsed_resume
+    from app.database import SessionLocal
+    from app.ml.embeddings import embedding_service
+
+    db = SessionLocal()
+    try:
+        # An identical file may have been parsed since the upload was queued
+        cached = find_parsed_resume(db, file_hash) if file_hash else None
+        if cached:
+            resume = reuse_parsed_resume(db, cached, user_id, filename)
+            db.commit()
+            return {
+                "status": "success",
+                "resume_id": resume.id,
+                "filename": filename,
+                "parsed_data": resume.parsed_data
+            }
+
+        self.update_state(state="PROGRESS", meta={"stage": "parsing"})
+        parsed_data = resume_parser.parse_resume(file_path)
+
+        self.update_state(state="PROGRESS", meta={"stage": "saving"})
+        resume = build_resume(user_id, filename, file_path, file_hash, parsed_data)
+        db.add(resume)
+        db.commit()
+
+        self.update_state(state="PROGRESS", meta={"stage": "embedding", "resume_id": resume.id})
+        try:
+            resume.embedding_id = embedding_service.store_resume_embedding(
+                resume_id=resume.id,
+                text=parsed_data["raw_text"],
+                metadata={"filename": filename}
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error generating embedding for resume {resume.id}: {e}")
+
+        return {
+            "status": "success",
+            "resume_id": resume.id,
+            "filename": filename,
+            "parsed_data": parsed_data
+        }
+
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+
 @celery_app.task
 def calculate_match_task(resume_id: int, job_id: int):
     """Background task to calculate match score."""
@@ -71,7 +173,7 @@ def calculate_match_task(resume_id: int, job_id: int):
     from app.database import SessionLocal
     from app.models.resume import Resume
     from app.models.job import Job
-    from app.models.match_score import MatchScore
+    from app.services.match_scores import upsert_match_score
 
     db = SessionLocal()
     try:
@@ -86,6 +188,7 @@ def calculate_match_task(resume_id: int, job_id: int):
             "skills": resume.skills or [],
             "experience_years": resume.experience_years,
             "education": resume.education or [],
+            "embedding_id": resume.embedding_id,
         }
 
         job_data = {
@@ -93,23 +196,13 @@ def calculate_match_task(resume_id: int, job_id: int):
             "required_skills": job.required_skills or [],
             "experience_level": job.experience_level or "mid",
             "location": job.location or "",
+            "embedding_id": job.embedding_id,
         }
 
         match_result = matching_engine.match_resume_to_job(resume_data, job_data)
 
         # Store result
-        existing_match = db.query(MatchScore).filter(
-            MatchScore.resume_id == resume_id,
-            MatchScore.job_id == job_id
-        ).first()
-
-        if existing_match:
-            for key, value in match_result.items():
-                setattr(existing_match, key, value)
-        else:
-            match_score = MatchScore(resume_id=resume_id, job_id=job_id, **match_result)
-            db.add(match_score)
-
+        upsert_match_score(db, resume_id, job_id, match_result)
         db.commit()
         return {"status": "success", "score": match_result["overall_score"]}
 
@@ -0,0 +1,29 @@
+"""Bounded executor for CPU-heavy work called from async endpoints."""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.config import settings
+
+# Model inference (torch, numpy) releases the GIL, so threads give real
+# parallelism here; the pool size caps how many run at once per worker
+cpu_executor = ThreadPoolExecutor(
+    max_workers=settings.CPU_POOL_WORKERS,
+    thread_name_prefix="cpu"
+)
+
+
+async def run_cpu(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a CPU-heavy call (parsing, embedding, matching) off the event loop.
+
+    Args:
+        func: Blocking function to run
+        *args, **kwargs: Passed to func
+
+    Returns:
+        func's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cpu_executor, functools.partial(func, *args, **kwargs))
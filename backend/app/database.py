@@ -1,5 +1,7 @@
 """Database configuration and session management."""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
@@ -15,6 +17,24 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for API endpoints: same database through asyncpg, so queries
+# await instead of blocking the event loop
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    pool_pre_ping=True,
+    pool_size=settings.ASYNC_DB_POOL_SIZE,
+    max_overflow=settings.ASYNC_DB_MAX_OVERFLOW
+)
+
+# Objects stay readable after commit; lazy loads are not available on
+# AsyncSession, so endpoints select what they need up front
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -28,6 +48,56 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# create_all only creates missing tables, so columns and indexes added to
+# existing tables are applied here. Every statement must be idempotent;
+# they run in order after create_all on each startup.
+SCHEMA_UPGRADES = [
+    # Content-hash upload cache (resumes)
+    "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS file_hash VARCHAR",
+    "ALTER TABLE resumes ADD COLUMN IF NOT EXISTS parser_version VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_resumes_file_hash ON resumes (file_hash)",
+    # Skip unchanged re-scrapes (jobs)
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    # Near-duplicate links (jobs); job_lsh_buckets is a new table
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS minhash BYTEA",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS canonical_job_id INTEGER REFERENCES jobs (id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_canonical_job_id ON jobs (canonical_job_id)",
+    # Job feed keyset order and substring search (jobs)
+    "CREATE INDEX IF NOT EXISTS ix_jobs_feed_order ON jobs (posted_date DESC NULLS LAST, id DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_title_trgm ON jobs USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_company_trgm ON jobs USING gin (company gin_trgm_ops)",
+    # One row per resume-job pair (match_scores): drop duplicates, keeping
+    # the newest row, only while the unique index is still missing
+    """
+    DO $$
+    BEGIN
+        IF to_regclass('ix_match_scores_resume_job') IS NULL THEN
+            DELETE FROM match_scores older USING match_scores newer
+            WHERE older.resume_id = newer.resume_id
+              AND older.job_id = newer.job_id
+              AND older.id < newer.id;
+            CREATE UNIQUE INDEX ix_match_scores_resume_job ON match_scores (resume_id, job_id);
+        END IF;
+    END $$
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_match_scores_resume_score"
+    " ON match_scores (resume_id, overall_score DESC) INCLUDE (job_id)",
+    "DROP INDEX IF EXISTS ix_match_scores_overall_score",
+]
+
+
 def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and upgrade existing ones."""
+    # Trigram search indexes on jobs depend on pg_trgm
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPGRADES:
+            conn.execute(text(statement))
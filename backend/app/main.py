@@ -1,8 +1,13 @@
 """Main FastAPI application."""
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import init_db
+from app.concurrency import cpu_executor
+from app.database import async_engine, init_db
+from app.middleware import BodySizeLimitMiddleware, MULTIPART_OVERHEAD
+from app.services.response_cache import response_cache
+from app.warmup import warm_up_services
 from app.api import auth, resumes, jobs, matching, applications
 
 # Initialize FastAPI app
@@ -12,6 +17,12 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+# Refuse oversized resume uploads before Starlette buffers the body
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={"/api/resumes/upload": settings.MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD},
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,9 +37,19 @@ app.add_middleware(
 async def startup_event():
     """Initialize services on startup."""
     init_db()
+    if settings.WARM_UP_ON_STARTUP:
+        # Load models in the background so /health is available immediately
+        asyncio.get_running_loop().run_in_executor(None, warm_up_services)
     print(f"🚀 {settings.APP_NAME} v{settings.VERSION} started!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release database connections and worker threads."""
+    await async_engine.dispose()
+    cpu_executor.shutdown(wait=False)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -45,6 +66,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/cache")
+async def cache_stats():
+    """Response cache hit/miss counts for this process."""
+    return {"enabled": response_cache.enabled, "namespaces": response_cache.get_stats()}
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(resumes.router, prefix="/api/resumes", tags=["Resumes"])
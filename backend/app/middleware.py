@@ -0,0 +1,52 @@
+"""ASGI middleware."""
+from typing import Dict
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+# Allowance for multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies over a per-path byte limit while they are received.
+
+    Starlette buffers the whole multipart body before the endpoint runs, so
+    a size check in the handler comes too late. Requests that declare a
+    larger Content-Length are refused before any of the body is read;
+    chunked or mis-declared bodies fail with 413 as soon as the running
+    byte count passes the limit.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = {path.rstrip("/"): limit for path, limit in limits.items()}
+
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http" and scope["method"] in ("POST", "PUT"):
+            limit = self.limits.get(scope["path"].rstrip("/"))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds maximum size of {limit} bytes"
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(413, detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
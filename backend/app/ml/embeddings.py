@@ -1,28 +1,250 @@
 """Embedding generation using Sentence Transformers."""
-from typing import List, Dict, Any
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import os
+import sqlite3
+import threading
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import Distance, VectorParams, PointStruct, PointIdsList
 import uuid
 from app.config import settings
 
 
+class _RedisEmbeddingStore:
+    """Persistent embedding store backed by Redis."""
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis
+        self.client = redis.Redis.from_url(
+            url, socket_connect_timeout=1, socket_timeout=1
+        )
+        self.ttl_seconds = ttl_seconds or None
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys)
+
+    def set_many(self, items: Dict[str, bytes]):
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(key, value, ex=self.ttl_seconds)
+        pipe.execute()
+
+
+class _FileEmbeddingStore:
+    """Persistent embedding store backed by a local SQLite file."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+        )
+        self.lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        placeholders = ",".join("?" for _ in keys)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                keys
+            ).fetchall()
+        found = dict(rows)
+        return [found.get(key) for key in keys]
+
+    def set_many(self, items: Dict[str, bytes]):
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                list(items.items())
+            )
+            self.conn.commit()
+
+
+class EmbeddingCache:
+    """
+    Two-tier, content-addressed embedding cache.
+
+    Vectors are keyed by (model name, sha256 of text). Lookups go to an
+    in-process LRU first and then to a persistent store shared between
+    workers (Redis or a local SQLite file, see EMBEDDING_CACHE_BACKEND).
+    """
+
+    def __init__(self, model_name: str, max_size: int, backend: str = "none"):
+        self.model_name = model_name
+        self.max_size = max_size
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "store_hits": 0, "misses": 0}
+        self.backend = backend
+        self._store = None
+        self._store_pid = None
+
+    @property
+    def store(self):
+        """Persistent store, (re)connected lazily in each process."""
+        if self._store_pid != os.getpid():
+            self._store = self._create_store(self.backend)
+            self._store_pid = os.getpid()
+        return self._store
+
+    def _create_store(self, backend: str):
+        """Create the persistent store, falling back to memory only on error."""
+        try:
+            if backend == "redis":
+                return _RedisEmbeddingStore(
+                    settings.REDIS_URL, settings.EMBEDDING_CACHE_TTL_SECONDS
+                )
+            if backend == "file":
+                return _FileEmbeddingStore(settings.EMBEDDING_CACHE_PATH)
+        except Exception as e:
+            print(f"Embedding cache store unavailable, using memory only: {e}")
+        return None
+
+    def key_for(self, text: str) -> str:
+        """Build the cache key for a text."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"emb:{self.model_name}:{digest}"
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up cached vectors; returns None for each miss."""
+        keys = [self.key_for(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        store_lookups = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    results[i] = vector
+                else:
+                    store_lookups.append(i)
+
+        if store_lookups and self.store is not None:
+            try:
+                raw = self.store.get_many([keys[i] for i in store_lookups])
+            except Exception as e:
+                print(f"Embedding cache store read failed: {e}")
+                raw = [None] * len(store_lookups)
+
+            promoted = {}
+            for i, value in zip(store_lookups, raw):
+                if value is not None:
+                    vector = np.frombuffer(value, dtype=np.float32).tolist()
+                    results[i] = vector
+                    promoted[keys[i]] = vector
+            if promoted:
+                self._put_memory(promoted)
+
+        with self._lock:
+            for i in store_lookups:
+                if results[i] is not None:
+                    self.stats["store_hits"] += 1
+                else:
+                    self.stats["misses"] += 1
+
+        return results
+
+    def set_many(self, texts: List[str], vectors: List[List[float]]):
+        """Store vectors in both tiers."""
+        items = {self.key_for(text): vector for text, vector in zip(texts, vectors)}
+        self._put_memory(items)
+
+        if self.store is not None:
+            try:
+                self.store.set_many({
+                    key: np.asarray(vector, dtype=np.float32).tobytes()
+                    for key, vector in items.items()
+                })
+            except Exception as e:
+                print(f"Embedding cache store write failed: {e}")
+
+    def _put_memory(self, items: Dict[str, List[float]]):
+        with self._lock:
+            for key, vector in items.items():
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and hit ratio."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_size"] = len(self._lru)
+        lookups = stats["memory_hits"] + stats["store_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["store_hits"]
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
 class EmbeddingService:
     """Generate and manage embeddings for resumes and jobs."""
 
     def __init__(self):
-        """Initialize embedding service."""
-        self.model = SentenceTransformer(settings.SENTENCE_TRANSFORMER_MODEL)
-        self.qdrant_client = QdrantClient(url=settings.QDRANT_URL)
-        self._ensure_collection()
+        """
+        Initialize embedding service.
 
-    def _ensure_collection(self):
+        Construction is cheap: the model is loaded on first use, and the
+        Qdrant client is created on first use in each process so that
+        forked workers never share a connection.
+        """
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._qdrant_client = None
+        self._qdrant_pid = None
+        self._qdrant_lock = threading.Lock()
+        self.cache = EmbeddingCache(
+            model_name=settings.SENTENCE_TRANSFORMER_MODEL,
+            max_size=settings.EMBEDDING_CACHE_SIZE,
+            backend=settings.EMBEDDING_CACHE_BACKEND
+        )
+        # Local cache of stored vectors keyed by Qdrant embedding ID
+        self._vector_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._vector_cache_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """SentenceTransformer model, loaded on first access."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(settings.SENTENCE_TRANSFORMER_MODEL)
+        return self._model
+
+    @property
+    def qdrant_client(self) -> QdrantClient:
+        """Qdrant client, created on first access in the current process."""
+        if self._qdrant_client is None or self._qdrant_pid != os.getpid():
+            with self._qdrant_lock:
+                if self._qdrant_client is None or self._qdrant_pid != os.getpid():
+                    client = QdrantClient(url=settings.QDRANT_URL)
+                    self._ensure_collection(client)
+                    self._qdrant_client = client
+                    self._qdrant_pid = os.getpid()
+        return self._qdrant_client
+
+    def load_model(self):
+        """Load the model without touching any network clients."""
+        return self.model
+
+    def warm_up(self):
+        """Load the model and connect to Qdrant ahead of the first request."""
+        self.load_model()
+        self.qdrant_client
+
+    def _ensure_collection(self, client: QdrantClient):
         """Ensure Qdrant collection exists."""
         try:
-            self.qdrant_client.get_collection(settings.QDRANT_COLLECTION_NAME)
+            client.get_collection(settings.QDRANT_COLLECTION_NAME)
         except Exception:
             # Collection doesn't exist, create it
-            self.qdrant_client.create_collection(
+            client.create_collection(
                 collection_name=settings.QDRANT_COLLECTION_NAME,
                 vectors_config=VectorParams(
                     size=settings.EMBEDDING_SIZE,
@@ -40,8 +262,118 @@ class EmbeddingService:
         Returns:
             Embedding vector
         """
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        return self.generate_embeddings([text])[0]
+
+    def generate_embeddings(
+        self,
+        texts: List[str],
+        batch_size: int = None
+    ) -> List[List[float]]:
+        """
+        Generate embedding vectors for many texts in batched forward passes.
+
+        Args:
+            texts: Input texts
+            batch_size: Texts per model forward pass (default: EMBEDDING_BATCH_SIZE)
+
+        Returns:
+            Embedding vectors, in the same order as texts
+        """
+        if not texts:
+            return []
+
+        results = self.cache.get_many(texts)
+
+        # Encode each distinct uncached text once
+        missing = list(dict.fromkeys(
+            text for text, vector in zip(texts, results) if vector is None
+        ))
+        if missing:
+            encoded = self.model.encode(
+                missing,
+                batch_size=batch_size or settings.EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True
+            ).tolist()
+            self.cache.set_many(missing, encoded)
+
+            by_text = dict(zip(missing, encoded))
+            results = [
+                vector if vector is not None else by_text[text]
+                for text, vector in zip(texts, results)
+            ]
+
+        return results
+
+    def _remember_vectors(self, vectors: Dict[str, List[float]]):
+        """Add stored vectors to the local vector cache."""
+        with self._vector_cache_lock:
+            for embedding_id, vector in vectors.items():
+                self._vector_cache[embedding_id] = vector
+                self._vector_cache.move_to_end(embedding_id)
+            while len(self._vector_cache) > settings.VECTOR_CACHE_SIZE:
+                self._vector_cache.popitem(last=False)
+
+    def get_vectors(self, embedding_ids: List[str]) -> Dict[str, List[float]]:
+        """
+        Fetch stored vectors by embedding ID.
+
+        Vectors are served from the local vector cache when possible and
+        otherwise retrieved from Qdrant in a single request.
+
+        Args:
+            embedding_ids: Qdrant point IDs
+
+        Returns:
+            Mapping of embedding ID to vector (IDs that don't exist are omitted)
+        """
+        found = {}
+        to_fetch = []
+        with self._vector_cache_lock:
+            for embedding_id in dict.fromkeys(embedding_ids):
+                vector = self._vector_cache.get(embedding_id)
+                if vector is not None:
+                    self._vector_cache.move_to_end(embedding_id)
+                    found[embedding_id] = vector
+                else:
+                    to_fetch.append(embedding_id)
+
+        if to_fetch:
+            try:
+                records = self.qdrant_client.retrieve(
+                    collection_name=settings.QDRANT_COLLECTION_NAME,
+                    ids=to_fetch,
+                    with_payload=False,
+                    with_vectors=True
+                )
+                fetched = {str(record.id): record.vector for record in records if record.vector}
+                self._remember_vectors(fetched)
+                found.update(fetched)
+            except Exception as e:
+                print(f"Error retrieving vectors from Qdrant: {e}")
+
+        return found
+
+    @staticmethod
+    def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
+        """Compute cosine similarity between two vectors."""
+        vec1_np = np.asarray(vec1, dtype=np.float32)
+        vec2_np = np.asarray(vec2, dtype=np.float32)
+
+        norm = np.linalg.norm(vec1_np) * np.linalg.norm(vec2_np)
+        if norm == 0:
+            return 0.0
+
+        return float(np.dot(vec1_np, vec2_np) / norm)
+
+    def _upsert_points(self, points: List[PointStruct]):
+        """Upsert points into Qdrant in chunks of QDRANT_UPSERT_BATCH_SIZE."""
+        self._remember_vectors({point.id: point.vector for point in points})
+        chunk_size = settings.QDRANT_UPSERT_BATCH_SIZE
+        for start in range(0, len(points), chunk_size):
+            self.qdrant_client.upsert(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                points=points[start:start + chunk_size]
+            )
 
     def store_resume_embedding(
         self,
@@ -69,16 +401,13 @@ class EmbeddingService:
             **(metadata or {})
         }
 
-        self.qdrant_client.upsert(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            points=[
-                PointStruct(
-                    id=embedding_id,
-                    vector=embedding,
-                    payload=payload
-                )
-            ]
-        )
+        self._upsert_points([
+            PointStruct(
+                id=embedding_id,
+                vector=embedding,
+                payload=payload
+            )
+        ])
 
         return embedding_id
 
@@ -108,18 +437,106 @@ class EmbeddingService:
             **(metadata or {})
         }
 
-        self.qdrant_client.upsert(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            points=[
+        self._upsert_points([
+            PointStruct(
+                id=embedding_id,
+                vector=embedding,
+                payload=payload
+            )
+        ])
+
+        return embedding_id
+
+    def store_job_embeddings(
+        self,
+        items: List[Dict[str, Any]],
+        batch_size: int = None
+    ) -> List[str]:
+        """
+        Generate and store embeddings for many jobs at once.
+
+        Args:
+            items: Dicts with keys job_id, text and optional metadata and
+                embedding_id (an existing point this one replaces)
+            batch_size: Texts per model forward pass (default: EMBEDDING_BATCH_SIZE)
+
+        Returns:
+            Embedding IDs in Qdrant, in the same order as items
+        """
+        return self._store_embeddings(items, "job", batch_size)
+
+    def store_resume_embeddings(
+        self,
+        items: List[Dict[str, Any]],
+        batch_size: int = None
+    ) -> List[str]:
+        """
+        Generate and store embeddings for many resumes at once.
+
+        Args:
+            items: Dicts with keys resume_id, text and optional metadata
+            batch_size: Texts per model forward pass (default: EMBEDDING_BATCH_SIZE)
+
+        Returns:
+            Embedding IDs in Qdrant, in the same order as items
+        """
+        return self._store_embeddings(items, "resume", batch_size)
+
+    def _store_embeddings(
+        self,
+        items: List[Dict[str, Any]],
+        point_type: str,
+        batch_size: int = None
+    ) -> List[str]:
+        """Encode items in batches and upsert them as points of point_type."""
+        if not items:
+            return []
+
+        embeddings = self.generate_embeddings(
+            [item["text"] for item in items],
+            batch_size=batch_size
+        )
+
+        id_key = f"{point_type}_id"
+        embedding_ids = []
+        points = []
+        for item, embedding in zip(items, embeddings):
+            # Always a new point: vectors cached by ID elsewhere can't go stale
+            embedding_id = str(uuid.uuid4())
+            embedding_ids.append(embedding_id)
+            points.append(
                 PointStruct(
                     id=embedding_id,
                     vector=embedding,
-                    payload=payload
+                    payload={
+                        id_key: item[id_key],
+                        "type": point_type,
+                        **(item.get("metadata") or {})
+                    }
                 )
-            ]
-        )
+            )
 
-        return embedding_id
+        self._upsert_points(points)
+        self._delete_points([item["embedding_id"] for item in items if item.get("embedding_id")])
+
+        return embedding_ids
+
+    def _delete_points(self, embedding_ids: List[str]):
+        """Delete replaced points from Qdrant and the local vector cache."""
+        if not embedding_ids:
+            return
+
+        with self._vector_cache_lock:
+            for embedding_id in embedding_ids:
+                self._vector_cache.pop(embedding_id, None)
+
+        try:
+            self.qdrant_client.delete(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                points_selector=PointIdsList(points=embedding_ids)
+            )
+        except Exception as e:
+            print(f"Error deleting {len(embedding_ids)} replaced embeddings: {e}")
 
     def search_similar_jobs(
         self,
@@ -137,22 +554,47 @@ class EmbeddingService:
             List of matching jobs with scores
         """
         embedding = self.generate_embedding(resume_text)
+        return self.search_similar_jobs_by_vector(embedding, limit=limit)
+
+    def search_similar_jobs_by_vector(
+        self,
+        vector: List[float],
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Find similar jobs for an existing embedding vector.
 
+        Returned job vectors are added to the local vector cache, so scoring
+        the candidates afterwards needs no further Qdrant round trips.
+
+        Args:
+            vector: Query embedding
+            limit: Number of results to return
+
+        Returns:
+            List of matching jobs with scores
+        """
         results = self.qdrant_client.search(
             collection_name=settings.QDRANT_COLLECTION_NAME,
-            query_vector=embedding,
+            query_vector=vector,
             query_filter={
                 "must": [
                     {"key": "type", "match": {"value": "job"}}
                 ]
             },
-            limit=limit
+            limit=limit,
+            with_vectors=True
         )
 
+        self._remember_vectors({
+            str(result.id): result.vector for result in results if result.vector
+        })
+
         matches = []
         for result in results:
             matches.append({
                 "job_id": result.payload.get("job_id"),
+                "embedding_id": str(result.id),
                 "semantic_similarity": result.score,
                 "metadata": result.payload
             })
@@ -170,19 +612,8 @@ class EmbeddingService:
         Returns:
             Similarity score (0-1)
         """
-        emb1 = self.generate_embedding(text1)
-        emb2 = self.generate_embedding(text2)
-
-        # Compute cosine similarity
-        import numpy as np
-        emb1_np = np.array(emb1)
-        emb2_np = np.array(emb2)
-
-        similarity = np.dot(emb1_np, emb2_np) / (
-            np.linalg.norm(emb1_np) * np.linalg.norm(emb2_np)
-        )
-
-        return float(similarity)
+        emb1, emb2 = self.generate_embeddings([text1, text2])
+        return self.cosine_similarity(emb1, emb2)
 
 
 # Singleton instance
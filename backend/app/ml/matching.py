@@ -1,5 +1,7 @@
 """Resume-Job matching engine."""
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
+import re
+import numpy as np
 from app.ml.embeddings import embedding_service
 
 
@@ -15,6 +17,9 @@ class MatchingEngine:
         "location": 0.05,
     }
 
+    # Words that mark a job as requiring a degree
+    DEGREE_PATTERN = re.compile(r"bachelor|master|phd|degree required", re.IGNORECASE)
+
     def calculate_keyword_score(
         self,
         resume_skills: List[str],
@@ -51,19 +56,39 @@ class MatchingEngine:
     def calculate_semantic_score(
         self,
         resume_text: str,
-        job_description: str
+        job_description: str,
+        resume_embedding_id: Optional[str] = None,
+        job_embedding_id: Optional[str] = None
     ) -> float:
         """
         Calculate semantic similarity score.
 
+        Stored vectors are reused when embedding IDs are given; text is only
+        encoded when no stored vector exists.
+
         Args:
             resume_text: Resume full text
             job_description: Job description full text
+            resume_embedding_id: Qdrant ID of the stored resume vector
+            job_embedding_id: Qdrant ID of the stored job vector
 
         Returns:
             Semantic similarity score (0-1)
         """
-        return embedding_service.compute_similarity(resume_text, job_description)
+        embedding_ids = [i for i in (resume_embedding_id, job_embedding_id) if i]
+        vectors = embedding_service.get_vectors(embedding_ids) if embedding_ids else {}
+
+        resume_vector = vectors.get(resume_embedding_id)
+        job_vector = vectors.get(job_embedding_id)
+
+        if resume_vector is None and job_vector is None:
+            return embedding_service.compute_similarity(resume_text, job_description)
+        if resume_vector is None:
+            resume_vector = embedding_service.generate_embedding(resume_text)
+        if job_vector is None:
+            job_vector = embedding_service.generate_embedding(job_description)
+
+        return embedding_service.cosine_similarity(resume_vector, job_vector)
 
     def calculate_experience_score(
         self,
@@ -123,8 +148,7 @@ class MatchingEngine:
         """
         if not resume_education:
             # Check if job requires degree
-            job_desc_lower = job_description.lower()
-            requires_degree = any(word in job_desc_lower for word in ["bachelor", "master", "phd", "degree required"])
+            requires_degree = bool(self.DEGREE_PATTERN.search(job_description))
 
             if requires_degree:
                 return 0.3  # Penalty if degree required but not found
@@ -229,9 +253,9 @@ class MatchingEngine:
 
         Args:
             resume_data: Parsed resume data with keys:
-                - raw_text, skills, experience_years, education, etc.
+                - raw_text, skills, experience_years, education, embedding_id, etc.
             job_data: Job data with keys:
-                - description, required_skills, experience_level, location, etc.
+                - description, required_skills, experience_level, location, embedding_id, etc.
 
         Returns:
             Dictionary with match results
@@ -253,7 +277,12 @@ class MatchingEngine:
             resume_skills, job_skills
         )
 
-        semantic_score = self.calculate_semantic_score(resume_text, job_description)
+        semantic_score = self.calculate_semantic_score(
+            resume_text,
+            job_description,
+            resume_embedding_id=resume_data.get("embedding_id"),
+            job_embedding_id=job_data.get("embedding_id")
+        )
         experience_score = self.calculate_experience_score(resume_years, job_level)
         education_score = self.calculate_education_score(resume_education, job_description)
         location_score = self.calculate_location_score(resume_location, job_location)
@@ -297,6 +326,151 @@ class MatchingEngine:
             "gaps": gaps,
         }
 
+    def _embedding_matrix(
+        self,
+        texts: List[str],
+        embedding_ids: List[Optional[str]]
+    ) -> np.ndarray:
+        """
+        Build a row-normalized embedding matrix for texts.
+
+        Stored vectors are reused by embedding ID; the remaining texts are
+        encoded in one batched call.
+        """
+        stored = embedding_service.get_vectors([i for i in embedding_ids if i])
+
+        vectors: List[Optional[List[float]]] = [stored.get(i) if i else None for i in embedding_ids]
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = embedding_service.generate_embeddings([texts[idx] for idx in missing])
+            for idx, vector in zip(missing, encoded):
+                vectors[idx] = vector
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def match_resume_to_jobs(
+        self,
+        resume_data: Dict[str, Any],
+        jobs: List[Dict[str, Any]],
+        top_n: Optional[int] = None
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Score one resume against many jobs at once.
+
+        Sub-scores are computed as NumPy arrays over all jobs (semantic
+        scores as a single matrix-vector product). Skill lists and
+        strengths/gaps are only built for the rows that are returned.
+
+        Args:
+            resume_data: Parsed resume data (same keys as match_resume_to_job)
+            jobs: Job data dicts (same keys as match_resume_to_job)
+            top_n: Return only the best N jobs (default: all)
+
+        Returns:
+            List of (index into jobs, match result), best match first
+        """
+        if not jobs:
+            return []
+
+        resume_text = resume_data.get("raw_text", "")
+        resume_skills = {s.lower() for s in resume_data.get("skills", [])}
+        resume_years = resume_data.get("experience_years")
+        resume_education = resume_data.get("education", [])
+        resume_location = resume_data.get("location", "")
+
+        n = len(jobs)
+        descriptions = [job.get("description", "") for job in jobs]
+        job_skills = [[s.lower() for s in job.get("required_skills", [])] for job in jobs]
+
+        # Keyword: fraction of each job's skills present in the resume
+        skill_counts = np.fromiter((len(skills) for skills in job_skills), dtype=np.int64, count=n)
+        skill_hits = np.fromiter(
+            (skill in resume_skills for skills in job_skills for skill in skills),
+            dtype=bool,
+            count=int(skill_counts.sum())
+        )
+        matched_counts = np.bincount(
+            np.repeat(np.arange(n), skill_counts), weights=skill_hits, minlength=n
+        )
+        keyword_scores = np.where(
+            skill_counts > 0, matched_counts / np.maximum(skill_counts, 1), 1.0
+        )
+
+        # Semantic: cosine similarity of normalized vectors
+        resume_vector = self._embedding_matrix([resume_text], [resume_data.get("embedding_id")])[0]
+        job_matrix = self._embedding_matrix(descriptions, [job.get("embedding_id") for job in jobs])
+        semantic_scores = job_matrix @ resume_vector
+
+        # Experience and location only depend on a few distinct job values
+        levels = [job.get("experience_level", "mid") for job in jobs]
+        level_scores = {
+            level: self.calculate_experience_score(resume_years, level) for level in set(levels)
+        }
+        experience_scores = np.fromiter((level_scores[level] for level in levels), dtype=float, count=n)
+
+        locations = [job.get("location", "") for job in jobs]
+        location_table = {
+            location: self.calculate_location_score(resume_location, location)
+            for location in set(locations)
+        }
+        location_scores = np.fromiter((location_table[loc] for loc in locations), dtype=float, count=n)
+
+        # Education: constant unless the resume lists no education
+        if resume_education:
+            education_scores = np.full(n, self.calculate_education_score(resume_education, ""))
+        else:
+            requires_degree = np.fromiter(
+                (bool(self.DEGREE_PATTERN.search(d)) for d in descriptions), dtype=bool, count=n
+            )
+            education_scores = np.where(requires_degree, 0.3, 0.8)
+
+        overall_scores = (
+            self.WEIGHTS["keyword"] * keyword_scores +
+            self.WEIGHTS["semantic"] * semantic_scores +
+            self.WEIGHTS["experience"] * experience_scores +
+            self.WEIGHTS["education"] * education_scores +
+            self.WEIGHTS["location"] * location_scores
+        )
+
+        # Select the returned rows
+        if top_n is not None and top_n < n:
+            selected = np.argpartition(-overall_scores, top_n)[:top_n]
+        else:
+            selected = np.arange(n)
+        selected = selected[np.argsort(-overall_scores[selected], kind="stable")]
+
+        results = []
+        for idx in selected.tolist():
+            matched_skills = [s for s in job_skills[idx] if s in resume_skills]
+            missing_skills = [s for s in job_skills[idx] if s not in resume_skills]
+            scores = {
+                "keyword": float(keyword_scores[idx]),
+                "semantic": float(semantic_scores[idx]),
+                "experience": float(experience_scores[idx]),
+                "education": float(education_scores[idx]),
+                "location": float(location_scores[idx]),
+            }
+            strengths, gaps = self.analyze_strengths_and_gaps(
+                resume_data, jobs[idx], matched_skills, missing_skills, scores
+            )
+            results.append((idx, {
+                "overall_score": round(float(overall_scores[idx]) * 100, 1),
+                "keyword_score": round(scores["keyword"] * 100, 1),
+                "semantic_score": round(scores["semantic"] * 100, 1),
+                "experience_score": round(scores["experience"] * 100, 1),
+                "education_score": round(scores["education"] * 100, 1),
+                "location_score": round(scores["location"] * 100, 1),
+                "matched_skills": matched_skills,
+                "missing_skills": missing_skills,
+                "strengths": strengths,
+                "gaps": gaps,
+            }))
+
+        return results
+
 
 # Singleton instance
 matching_engine = MatchingEngine()
@@ -4,5 +4,7 @@ from app.models.resume import Resume
 from app.models.job import Job
 from app.models.application import Application
 from app.models.match_score import MatchScore
+from app.models.scrape_cursor import ScrapeCursor
+from app.models.job_lsh_bucket import JobLshBucket
 
-__all__ = ["User", "Resume", "Job", "Application", "MatchScore"]
+__all__ = ["User", "Resume", "Job", "Application", "MatchScore", "ScrapeCursor", "JobLshBucket"]
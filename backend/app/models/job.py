@@ -1,5 +1,5 @@
 """Job model."""
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float, ForeignKey, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -34,6 +34,14 @@ class Job(Base):
     benefits = Column(JSON, nullable=True)
     parsed_data = Column(JSON, nullable=True)  # Full parsed job data
 
+    # SHA-256 of the posting content, used to skip unchanged re-scrapes
+    content_hash = Column(String(64), nullable=True)
+
+    # Near-duplicate detection: MinHash of the description, and the job this
+    # one duplicates (NULL for canonical jobs)
+    minhash = Column(LargeBinary, nullable=True)
+    canonical_job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True, index=True)
+
     # Embedding for semantic search
     embedding_id = Column(String, nullable=True)  # ID in Qdrant
 
@@ -47,3 +55,23 @@ class Job(Base):
     # Relationships
     match_scores = relationship("MatchScore", back_populates="job", cascade="all, delete-orphan")
     applications = relationship("Application", back_populates="job", cascade="all, delete-orphan")
+
+
+# Postgres-only indexes are skipped when the schema is created on another
+# dialect (the SQLite test database)
+
+# Keyset pagination order for the job feed
+Index(
+    "ix_jobs_feed_order", Job.posted_date.desc().nulls_last(), Job.id.desc()
+).ddl_if(dialect="postgresql")
+
+# Trigram indexes so title/company ILIKE '%term%' searches avoid a full scan
+# (needs the pg_trgm extension, created in init_db)
+Index(
+    "ix_jobs_title_trgm", Job.title,
+    postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_jobs_company_trgm", Job.company,
+    postgresql_using="gin", postgresql_ops={"company": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
@@ -0,0 +1,13 @@
+"""Job LSH bucket model."""
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.database import Base
+
+
+class JobLshBucket(Base):
+    """One MinHash LSH band bucket of a canonical job, for near-duplicate lookup."""
+
+    __tablename__ = "job_lsh_buckets"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    bucket = Column(String(24), nullable=False, index=True)  # "<band>:<band hash>"
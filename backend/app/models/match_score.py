@@ -1,5 +1,5 @@
 """Match score model."""
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -15,7 +15,7 @@ class MatchScore(Base):
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
 
     # Overall match score (0-100)
-    overall_score = Column(Float, nullable=False, index=True)
+    overall_score = Column(Float, nullable=False)
 
     # Sub-scores
     keyword_score = Column(Float, nullable=True)  # Keyword overlap score
@@ -39,3 +39,14 @@ class MatchScore(Base):
     # Relationships
     resume = relationship("Resume", back_populates="match_scores")
     job = relationship("Job", back_populates="match_scores")
+
+
+# One row per resume-job pair; the conflict target of match score upserts
+Index("ix_match_scores_resume_job", MatchScore.resume_id, MatchScore.job_id, unique=True)
+
+# Per-resume feed sorted by score; job_id is included so ranking and the
+# min_score filter are answered from the index alone
+Index(
+    "ix_match_scores_resume_score", MatchScore.resume_id, MatchScore.overall_score.desc(),
+    postgresql_include=["job_id"]
+)
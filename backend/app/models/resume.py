@@ -14,6 +14,8 @@ class Resume(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
+    file_hash = Column(String, nullable=True, index=True)  # sha256 of uploaded file
+    parser_version = Column(String, nullable=True)  # Parser version that produced parsed_data
 
     # Raw text content
     raw_text = Column(Text, nullable=False)
@@ -0,0 +1,28 @@
+"""Scrape cursor model."""
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ScrapeCursor(Base):
+    """High-water mark for one (search_term, location, site) scrape query."""
+
+    __tablename__ = "scrape_cursors"
+    __table_args__ = (
+        UniqueConstraint("search_term", "location", "site", name="uq_scrape_cursor_query"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    search_term = Column(String, nullable=False)
+    location = Column(String, nullable=False, default="")
+    site = Column(String, nullable=False)
+
+    # Newest posting seen and when the query last ran
+    last_posted_date = Column(DateTime(timezone=True), nullable=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Most recent external IDs seen for this query (newest first, capped)
+    known_external_ids = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
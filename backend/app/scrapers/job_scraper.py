@@ -1,8 +1,18 @@
 """Job scraper using JobSpy library."""
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterator, Optional, Set, Any
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-import re
+import hashlib
+import threading
+import time
+import numpy as np
+import pandas as pd
 from jobspy import scrape_jobs
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import scrape_cursor
+from app.services.skill_extractor import skill_extractor
 
 
 class JobScraper:
@@ -10,31 +20,24 @@ class JobScraper:
 
     SUPPORTED_SITES = ["indeed", "linkedin", "zip_recruiter", "glassdoor", "google"]
 
+    # Per-site (max concurrent queries, min seconds between query starts)
+    SITE_LIMITS = {
+        "indeed": (4, 1.0),
+        "linkedin": (2, 3.0),
+        "zip_recruiter": (2, 2.0),
+        "glassdoor": (2, 2.0),
+        "google": (2, 2.0),
+    }
+    DEFAULT_SITE_LIMIT = (2, 2.0)
+
     def __init__(self):
         """Initialize job scraper."""
-        pass
+        self._limiters: Dict[str, _SiteLimiter] = {}
+        self._limiters_lock = threading.Lock()
 
     def extract_skills_from_description(self, description: str) -> List[str]:
         """Extract technical skills from job description."""
-        # Common tech skills to look for
-        tech_skills = {
-            "python", "java", "javascript", "typescript", "c++", "c#", "ruby", "go",
-            "react", "angular", "vue", "node.js", "express", "fastapi", "django", "flask",
-            "spring", "pytorch", "tensorflow", "sklearn", "pandas", "numpy",
-            "postgresql", "mysql", "mongodb", "redis", "elasticsearch",
-            "aws", "azure", "gcp", "docker", "kubernetes", "jenkins",
-            "git", "linux", "rest api", "graphql", "microservices",
-        }
-
-        description_lower = description.lower()
-        found_skills = []
-
-        for skill in tech_skills:
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, description_lower):
-                found_skills.append(skill)
-
-        return found_skills
+        return skill_extractor.extract(description)
 
     def parse_experience_level(self, description: str, title: str) -> Optional[str]:
         """Determine experience level from job posting."""
@@ -54,7 +57,9 @@ class JobScraper:
         results_wanted: int = 20,
         hours_old: int = 72,
         country: str = "USA",
-        sites: List[str] = None
+        sites: List[str] = None,
+        skip_external_ids: Optional[Set[str]] = None,
+        raise_errors: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Scrape jobs from multiple job boards.
@@ -66,6 +71,8 @@ class JobScraper:
             hours_old: Only return jobs posted within this many hours
             country: Country to search in
             sites: List of sites to scrape (default: all supported sites)
+            skip_external_ids: Already known jobs to drop before normalization
+            raise_errors: Re-raise scraping errors instead of returning []
 
         Returns:
             List of job dictionaries
@@ -88,48 +95,108 @@ class JobScraper:
             if jobs_df is None or jobs_df.empty:
                 return []
 
-            jobs = []
-            for _, row in jobs_df.iterrows():
-                # Parse and structure the job data
-                description = str(row.get("description", ""))
-                title = str(row.get("title", ""))
-
-                # Extract additional information
-                required_skills = self.extract_skills_from_description(description)
-                experience_level = self.parse_experience_level(description, title)
-
-                job_data = {
-                    "title": title,
-                    "company": str(row.get("company", "")),
-                    "location": str(row.get("location", "")),
-                    "job_url": str(row.get("job_url", "")),
-                    "description": description,
-                    "source": str(row.get("site", "")),
-                    "external_id": self.generate_external_id(
-                        str(row.get("site", "")),
-                        str(row.get("job_url", ""))
-                    ),
-                    "job_type": str(row.get("job_type", "")),
-                    "posted_date": self.parse_date(row.get("date_posted")),
-                    "salary_min": self.parse_salary(row.get("min_amount")),
-                    "salary_max": self.parse_salary(row.get("max_amount")),
-                    "required_skills": required_skills,
-                    "experience_level": experience_level,
-                    "is_active": True,
-                }
-
-                jobs.append(job_data)
-
-            return jobs
+            return self.normalize_jobs(jobs_df, skip_external_ids=skip_external_ids)
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error scraping jobs: {e}")
             return []
 
+    def normalize_jobs(
+        self,
+        jobs_df: pd.DataFrame,
+        skip_external_ids: Optional[Set[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Convert a JobSpy DataFrame to job dicts, column by column.
+
+        Dates and salaries are coerced with pandas, experience levels are
+        derived with vectorized string matching, and skills are extracted
+        for all descriptions in one batch. Rows whose external_id is in
+        skip_external_ids are dropped before any of that work.
+        """
+        if jobs_df is None or jobs_df.empty:
+            return []
+
+        if skip_external_ids:
+            ids = [
+                self.generate_external_id(site, job_url)
+                for site, job_url in zip(
+                    jobs_df.get("site", pd.Series([""] * len(jobs_df))).fillna("").astype(str),
+                    jobs_df.get("job_url", pd.Series([""] * len(jobs_df))).fillna("").astype(str)
+                )
+            ]
+            jobs_df = jobs_df[[external_id not in skip_external_ids for external_id in ids]]
+            if jobs_df.empty:
+                return []
+
+        def column(name: str) -> pd.Series:
+            if name in jobs_df:
+                return jobs_df[name]
+            return pd.Series([None] * len(jobs_df), index=jobs_df.index, dtype=object)
+
+        def text(name: str) -> pd.Series:
+            return column(name).fillna("").astype(str)
+
+        def nullable(values: pd.Series) -> List[Any]:
+            return values.astype(object).where(values.notna(), None).tolist()
+
+        titles = text("title")
+        descriptions = text("description")
+        sites = text("site")
+        job_urls = text("job_url")
+
+        # Experience level (same keyword rules as parse_experience_level)
+        combined = (titles + " " + descriptions).str.lower()
+        is_senior = combined.str.contains("senior|lead|principal|staff|architect", regex=True)
+        is_entry = combined.str.contains("junior|entry|associate|graduate", regex=True)
+        experience_levels = np.select([is_senior, is_entry], ["senior", "entry"], default="mid")
+
+        posted_dates = pd.to_datetime(column("date_posted"), errors="coerce", utc=True).dt.tz_localize(None)
+        salary_min = pd.to_numeric(column("min_amount"), errors="coerce")
+        salary_max = pd.to_numeric(column("max_amount"), errors="coerce")
+
+        external_ids = [
+            self.generate_external_id(site, job_url) for site, job_url in zip(sites, job_urls)
+        ]
+        required_skills = skill_extractor.extract_many(descriptions.tolist())
+
+        records = zip(
+            titles.tolist(), text("company").tolist(), text("location").tolist(),
+            job_urls.tolist(), descriptions.tolist(), sites.tolist(), external_ids,
+            text("job_type").tolist(),
+            [d.to_pydatetime() if d is not None else None for d in nullable(posted_dates)],
+            nullable(salary_min), nullable(salary_max), required_skills,
+            experience_levels.tolist(),
+        )
+
+        return [
+            {
+                "title": title,
+                "company": company,
+                "location": location,
+                "job_url": job_url,
+                "description": description,
+                "source": source,
+                "external_id": external_id,
+                "job_type": job_type,
+                "posted_date": posted_date,
+                "salary_min": min_amount,
+                "salary_max": max_amount,
+                "required_skills": skills,
+                "experience_level": experience_level,
+                "is_active": True,
+            }
+            for (
+                title, company, location, job_url, description, source, external_id,
+                job_type, posted_date, min_amount, max_amount, skills, experience_level
+            ) in records
+        ]
+
     def generate_external_id(self, source: str, job_url: str) -> str:
         """Generate unique external ID for a job."""
         # Use hash of source + URL to create unique ID
-        import hashlib
         unique_string = f"{source}_{job_url}"
         return hashlib.md5(unique_string.encode()).hexdigest()
 
@@ -161,11 +228,59 @@ class JobScraper:
         except (ValueError, TypeError):
             return None
 
+    def scrape_incremental(
+        self,
+        db: Session,
+        search_term: str,
+        location: str = "",
+        results_wanted: int = 20,
+        max_hours_old: int = 72,
+        sites: List[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Scrape only postings that are new since the last run of each query.
+
+        Every (search_term, location, site) has a ScrapeCursor. The request
+        window is cut to the time since the cursor's last run (plus
+        SCRAPE_CURSOR_OVERLAP_HOURS, capped at max_hours_old), and jobs the
+        cursor already knows are dropped before normalization. A site whose
+        scrape fails keeps its cursor unchanged, so the next run asks for
+        the missed window again. The caller commits the cursor updates with
+        the scraped jobs.
+
+        Returns:
+            List of new job dictionaries
+        """
+        if sites is None:
+            sites = ["indeed", "linkedin"]  # Default to most reliable sources
+
+        jobs = []
+        for site in sites:
+            cursor = scrape_cursor.get_cursor(db, search_term, location, site)
+            try:
+                site_jobs = self.scrape(
+                    search_term=search_term,
+                    location=location,
+                    results_wanted=results_wanted,
+                    hours_old=scrape_cursor.window_hours(cursor, max_hours_old),
+                    sites=[site],
+                    skip_external_ids=set(cursor.known_external_ids or []),
+                    raise_errors=True
+                )
+            except Exception as e:
+                print(f"Error scraping jobs ({site}): {e}")
+                continue
+            scrape_cursor.advance_cursor(cursor, site_jobs)
+            jobs.extend(site_jobs)
+
+        return jobs
+
     def scrape_by_preferences(
         self,
         job_titles: List[str],
         locations: List[str],
-        results_per_query: int = 20
+        results_per_query: int = 20,
+        sites: List[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Scrape jobs based on user preferences.
@@ -174,29 +289,126 @@ class JobScraper:
             job_titles: List of job titles to search
             locations: List of locations to search
             results_per_query: Results to fetch per query
+            sites: List of sites to scrape (default: indeed and linkedin)
 
         Returns:
             Deduplicated list of jobs
         """
-        all_jobs = []
-        seen_external_ids = set()
+        return list(self.iter_scrape_by_preferences(
+            job_titles, locations, results_per_query, sites
+        ))
+
+    def iter_scrape_by_preferences(
+        self,
+        job_titles: List[str],
+        locations: List[str],
+        results_per_query: int = 20,
+        sites: List[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run every title x location x site query concurrently.
 
-        for title in job_titles:
-            for location in locations:
-                jobs = self.scrape(
+        Each site has its own concurrency cap and minimum interval between
+        requests (SITE_LIMITS). A query that runs longer than
+        SCRAPE_QUERY_TIMEOUT_SECONDS is abandoned. Jobs are yielded as soon
+        as their query finishes, deduplicated on external_id.
+        """
+        if sites is None:
+            sites = ["indeed", "linkedin"]  # Default to most reliable sources
+
+        queries = [
+            (title, location, site)
+            for title in job_titles
+            for location in locations
+            for site in sites
+        ]
+        if not queries:
+            return
+
+        started: Dict[int, float] = {}
+
+        def run_query(index: int) -> List[Dict[str, Any]]:
+            title, location, site = queries[index]
+            limiter = self._site_limiter(site)
+            with limiter:
+                started[index] = time.monotonic()
+                return self.scrape(
                     search_term=title,
                     location=location,
-                    results_wanted=results_per_query
+                    results_wanted=results_per_query,
+                    sites=[site]
                 )
 
-                # Deduplicate
-                for job in jobs:
-                    external_id = job.get("external_id")
-                    if external_id and external_id not in seen_external_ids:
-                        seen_external_ids.add(external_id)
-                        all_jobs.append(job)
-
-        return all_jobs
+        timeout = settings.SCRAPE_QUERY_TIMEOUT_SECONDS
+        seen_external_ids = set()
+        executor = ThreadPoolExecutor(
+            max_workers=min(settings.SCRAPE_MAX_WORKERS, len(queries)),
+            thread_name_prefix="scrape"
+        )
+        try:
+            futures = {executor.submit(run_query, i): i for i in range(len(queries))}
+            pending = set(futures)
+
+            while pending:
+                done, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    try:
+                        jobs = future.result()
+                    except Exception as e:
+                        print(f"Error scraping {queries[futures[future]]}: {e}")
+                        continue
+
+                    # Deduplicate
+                    for job in jobs:
+                        external_id = job.get("external_id")
+                        if external_id and external_id not in seen_external_ids:
+                            seen_external_ids.add(external_id)
+                            yield job
+
+                now = time.monotonic()
+                expired = {
+                    future for future in pending
+                    if futures[future] in started and now - started[futures[future]] > timeout
+                }
+                for future in expired:
+                    print(f"Scrape query timed out after {timeout}s: {queries[futures[future]]}")
+                pending -= expired
+        finally:
+            # Don't wait for abandoned queries
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _site_limiter(self, site: str) -> "_SiteLimiter":
+        """Get the shared rate limiter for a site."""
+        with self._limiters_lock:
+            if site not in self._limiters:
+                max_concurrent, min_interval = self.SITE_LIMITS.get(site, self.DEFAULT_SITE_LIMIT)
+                self._limiters[site] = _SiteLimiter(max_concurrent, min_interval)
+            return self._limiters[site]
+
+
+class _SiteLimiter:
+    """Cap concurrent requests to a site and space out their start times."""
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self._semaphore = threading.Semaphore(max_concurrent)
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._min_interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc):
+        self._semaphore.release()
+        return False
 
 
 # Singleton instance
@@ -10,14 +10,21 @@ It uses AI to:
 """
 
 import requests
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
+from datetime import date, datetime, timedelta
 import hashlib
 from sqlalchemy.orm import Session
 
-from ..models.job import Job
+from ..config import settings
+from ..database import SessionLocal
+from ..services import scrape_cursor
+from ..services.ingest_pipeline import StreamingPipeline, batched
+from ..services.job_ingest import upsert_jobs, embed_jobs
 from ..services.job_validator import JobValidator
 
+JOBSPY_SITES = ["indeed", "linkedin", "zip_recruiter", "glassdoor"]
+
 
 class AIJobDiscovery:
     """
@@ -51,59 +58,23 @@ class AIJobDiscovery:
         print(f"🔍 AI Job Discovery: Searching for '{search_term}' in '{location}'")
         print(f"📅 Only finding jobs posted in last {max_age_days} days")
 
-        # Get jobs from multiple sources
-        all_jobs = []
-
         # Source 1: JobSpy (Indeed, LinkedIn, ZipRecruiter, Glassdoor)
-        print("📥 Fetching from JobSpy sources...")
-        jobspy_jobs = self._fetch_from_jobspy(search_term, location, max_results)
-        all_jobs.extend(jobspy_jobs)
-
         # Source 2: Could add more sources here
         # - Adzuna API (free tier)
         # - The Muse API
         # - GitHub Jobs (for tech)
         # - RemoteOK (for remote jobs)
-
+        all_jobs = self._fetch_from_jobspy(search_term, location, max_results, max_age_days)
         print(f"📊 Found {len(all_jobs)} total jobs from all sources")
 
-        # AI Validation & Filtering
-        print("🤖 AI validating jobs for quality and freshness...")
-        validated_jobs = []
-
-        for job in all_jobs:
-            # Validate with AI
-            validation = self.validator.validate_job(job)
-
-            # Check if job passes quality filters
-            if not validation["is_valid"]:
-                print(f"❌ Rejected: {job.get('title')} - {validation['warnings']}")
-                continue
-
-            if validation["is_spam"]:
-                print(f"🚫 Spam detected: {job.get('title')}")
-                continue
-
-            if validation["age_days"] > max_age_days:
-                print(f"⏰ Too old ({validation['age_days']} days): {job.get('title')}")
-                continue
-
-            if validation["confidence_score"] < 0.7:
-                print(f"⚠️ Low quality ({validation['confidence_score']}): {job.get('title')}")
-                continue
-
-            # Add validation metadata to job
-            job["validation"] = validation
-            job["ai_quality_score"] = validation["confidence_score"]
-            job["age_days"] = validation["age_days"]
-
-            validated_jobs.append(job)
-
-        print(f"✅ {len(validated_jobs)} high-quality, fresh jobs found!")
-
-        # Deduplicate by job signature
-        deduplicated = self._deduplicate_jobs(validated_jobs)
-        print(f"🔄 {len(deduplicated)} unique jobs after deduplication")
+        # AI Validation & Filtering, then dedupe by job signature
+        # Large runs validate in a process pool (VALIDATE_WORKERS)
+        rejected = Counter()
+        validated = self._filter_validated(
+            zip(all_jobs, self.validator.validate_jobs(all_jobs)), max_age_days, rejected
+        )
+        deduplicated = list(self._deduplicate_stream(validated))
+        print(f"✅ {len(deduplicated)} high-quality, fresh, unique jobs found! Rejected: {dict(rejected)}")
 
         # Sort by quality score
         deduplicated.sort(key=lambda j: j.get("ai_quality_score", 0), reverse=True)
@@ -111,52 +82,271 @@ class AIJobDiscovery:
         # Return top results
         return deduplicated[:max_results]
 
+    def ingest_jobs(
+        self,
+        search_term: str,
+        location: str = "Remote",
+        max_results: int = 50,
+        max_age_days: int = 14
+    ) -> Dict[str, Any]:
+        """
+        Discover, save and embed jobs as a streaming pipeline.
+
+        fetch -> validate -> dedupe -> persist -> embed run concurrently with
+        bounded queues between them, so validation and DB writes overlap with
+        fetching the next source, and only queue-sized buffers are held in
+        memory. Jobs are saved in batches of INGEST_PERSIST_BATCH_SIZE and
+        embedded in batches of INGEST_EMBED_BATCH_SIZE. max_results is the
+        number of results requested per source. Scrape cursors only advance
+        over jobs that were saved, and not at all if a stage or embedding
+        batch failed, so unsaved jobs are fetched again next run.
+
+        Returns:
+            Totals (inserted/updated/unchanged/embedded), rejection reasons
+            and per-stage throughput counters
+        """
+        print(f"🔍 AI Job Ingest: '{search_term}' in '{location}' (last {max_age_days} days)")
+
+        plan = self._plan_cursors(search_term, location, max_age_days)
+        seen = {}
+        rejected = Counter()
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0, "embedded": 0}
+        saved_ids, unsaved_ids = set(), set()
+        embed_failed = False
+
+        def persist(jobs):
+            for batch in batched(jobs, settings.INGEST_PERSIST_BATCH_SIZE):
+                result = self.save_jobs(batch)
+                if "error" in result:
+                    unsaved_ids.update(job.get("external_id") for job in batch)
+                    continue
+                saved_ids.update(job.get("external_id") for job in batch)
+                for key in ("inserted", "updated", "unchanged"):
+                    totals[key] += result[key]
+                yield from result["needs_embedding"]
+
+        def embed(job_ids):
+            nonlocal embed_failed
+            db = SessionLocal()
+            try:
+                for batch in batched(job_ids, settings.INGEST_EMBED_BATCH_SIZE):
+                    try:
+                        totals["embedded"] += embed_jobs(db, batch)
+                        db.commit()
+                    except Exception as e:
+                        embed_failed = True
+                        db.rollback()
+                        print(f"❌ Failed to embed {len(batch)} jobs: {e}")
+                        continue
+                    yield from batch
+            finally:
+                db.close()
+
+        pipeline = StreamingPipeline(
+            self._iter_jobspy(search_term, location, max_results, plan, seen),
+            [
+                ("validate", lambda jobs: self._validate_stream(jobs, max_age_days, rejected)),
+                ("dedupe", self._deduplicate_stream),
+                ("persist", persist),
+                ("embed", embed),
+            ]
+        )
+        for _ in pipeline.run():
+            pass
+
+        stats = pipeline.get_stats()
+
+        # Jobs still in flight when a stage failed, or saved without an
+        # embedding, must be offered again: leave the cursors where they were
+        if embed_failed or any(stage["error"] for stage in stats):
+            print("⚠️ Ingest incomplete; scrape cursors not advanced")
+        else:
+            self._advance_cursors(search_term, location, {
+                site: [job for job in jobs if job["external_id"] in saved_ids]
+                for site, jobs in seen.items()
+                if not any(job["external_id"] in unsaved_ids for job in jobs)
+            })
+            self.db.commit()
+
+        print(f"💾 Ingest done: {totals}, rejected: {dict(rejected)}")
+        return {**totals, "rejected": dict(rejected), "stages": stats}
+
+    def _plan_cursors(
+        self,
+        search_term: str,
+        location: str,
+        max_age_days: int
+    ) -> Dict[str, Tuple[int, Set[str]]]:
+        """Per-site (hours_old, known external IDs) from the scrape cursors."""
+        plan = {}
+        for site in JOBSPY_SITES:
+            cursor = scrape_cursor.get_cursor(self.db, search_term, location, site)
+            plan[site] = (
+                scrape_cursor.window_hours(cursor, max_age_days * 24),
+                set(cursor.known_external_ids or [])
+            )
+        return plan
+
+    def _advance_cursors(
+        self,
+        search_term: str,
+        location: str,
+        seen: Dict[str, List[Dict[str, Any]]]
+    ):
+        """Record what each site returned on its cursor (caller commits)."""
+        for site, jobs in seen.items():
+            cursor = scrape_cursor.get_cursor(self.db, search_term, location, site)
+            scrape_cursor.advance_cursor(cursor, jobs)
+
     def _fetch_from_jobspy(
         self,
         search_term: str,
         location: str,
-        max_results: int
+        max_results: int,
+        max_age_days: int = 14
     ) -> List[Dict[str, Any]]:
-        """Fetch jobs using JobSpy library."""
+        """
+        Fetch jobs using JobSpy library.
+
+        Nothing fetched here is saved, so the scrape cursors are neither read
+        nor advanced: every site is searched over the full max_age_days window.
+        Only ingest_jobs moves cursors, and only over jobs it persisted.
+        """
+        plan = {site: (max_age_days * 24, set()) for site in JOBSPY_SITES}
+        return list(self._iter_jobspy(search_term, location, max_results, plan, {}))
+
+    def _iter_jobspy(
+        self,
+        search_term: str,
+        location: str,
+        max_results: int,
+        plan: Dict[str, Tuple[int, Set[str]]],
+        seen: Dict[str, List[Dict[str, Any]]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield normalized jobs site by site, skipping ones the cursor knows.
+
+        Touches no DB state, so it can run on a pipeline thread; the
+        external IDs and dates it yields are collected in seen per site.
+        """
         try:
             from python_jobspy import scrape_jobs
-
-            # Scrape from multiple sites
-            jobs_df = scrape_jobs(
-                site_name=["indeed", "linkedin", "zip_recruiter", "glassdoor"],
-                search_term=search_term,
-                location=location,
-                results_wanted=max_results,
-                hours_old=336,  # 14 days = 336 hours
-                country_indeed='USA'
-            )
+        except ImportError as e:
+            print(f"❌ JobSpy error: {e}")
+            return
+
+        for site, (hours_old, known_ids) in plan.items():
+            try:
+                jobs_df = scrape_jobs(
+                    site_name=[site],
+                    search_term=search_term,
+                    location=location,
+                    results_wanted=max_results,
+                    hours_old=hours_old,
+                    country_indeed='USA'
+                )
+            except Exception as e:
+                print(f"❌ JobSpy error ({site}): {e}")
+                continue
 
             # Convert to list of dicts
-            jobs = jobs_df.to_dict('records')
+            jobs = jobs_df.to_dict('records') if jobs_df is not None else []
 
-            # Normalize field names
-            normalized = []
+            # Normalize field names, skipping postings this query already returned
+            site_seen = seen.setdefault(site, [])
             for job in jobs:
-                normalized.append({
+                url = job.get("job_url") or job.get("url")
+                external_id = hashlib.md5(f"{job.get('site') or site}_{url}".encode()).hexdigest()
+                if external_id in known_ids:
+                    continue
+
+                posted_date = job.get("date_posted") or job.get("posted_date")
+                site_seen.append({"external_id": external_id, "posted_date": self._as_datetime(posted_date)})
+                yield {
+                    "external_id": external_id,
                     "title": job.get("title") or job.get("job_title"),
                     "company": job.get("company") or job.get("company_name"),
                     "location": job.get("location"),
                     "description": job.get("description"),
-                    "url": job.get("job_url") or job.get("url"),
-                    "posted_date": job.get("date_posted") or job.get("posted_date"),
+                    "url": url,
+                    "posted_date": posted_date,
                     "salary_min": job.get("min_amount"),
                     "salary_max": job.get("max_amount"),
                     "job_type": job.get("job_type"),
                     "source": job.get("site"),
-                })
+                }
+
+    @staticmethod
+    def _as_datetime(value: Any) -> Optional[datetime]:
+        """Coerce a JobSpy date (date, datetime or string) to a naive datetime."""
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        if isinstance(value, date):
+            return datetime(value.year, value.month, value.day)
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value).replace(tzinfo=None)
+            except ValueError:
+                return None
+        return None
+
+    def _validate_stream(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        max_age_days: int,
+        rejected: Counter
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Validate jobs in batches as they stream in.
 
-            return normalized
+        Batches go through validate_jobs, so with VALIDATE_WORKERS > 1 each
+        batch of VALIDATE_PARALLEL_MIN_JOBS is spread over the process pool;
+        otherwise batches of VALIDATE_CHUNK_SIZE are validated in-process.
+        """
+        if settings.VALIDATE_WORKERS > 1:
+            batch_size = settings.VALIDATE_PARALLEL_MIN_JOBS
+        else:
+            batch_size = settings.VALIDATE_CHUNK_SIZE
 
-        except Exception as e:
-            print(f"❌ JobSpy error: {e}")
-            return []
+        def validated():
+            for batch in batched(jobs, batch_size):
+                yield from zip(batch, self.validator.validate_jobs(batch))
+
+        return self._filter_validated(validated(), max_age_days, rejected)
+
+    def _filter_validated(
+        self,
+        validated: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+        max_age_days: int,
+        rejected: Counter
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield jobs whose validation passes the quality filters, counting rejection reasons."""
+        for job, validation in validated:
+            # Check if job passes quality filters
+            if not validation["is_valid"]:
+                rejected["invalid"] += 1
+                continue
 
-    def _deduplicate_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            if validation["is_spam"]:
+                rejected["spam"] += 1
+                continue
+
+            if validation["age_days"] is not None and validation["age_days"] > max_age_days:
+                rejected["too_old"] += 1
+                continue
+
+            if validation["confidence_score"] < 0.7:
+                rejected["low_quality"] += 1
+                continue
+
+            # Add validation metadata to job
+            job["validation"] = validation
+            job["ai_quality_score"] = validation["confidence_score"]
+            job["age_days"] = validation["age_days"]
+
+            yield job
+
+    def _deduplicate_stream(self, jobs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """
         Remove duplicate job postings using content-based signatures.
 
@@ -164,7 +354,6 @@ class AIJobDiscovery:
         "signature" based on title + company + location.
         """
         seen_signatures = set()
-        unique_jobs = []
 
         for job in jobs:
             # Create job signature
@@ -172,9 +361,7 @@ class AIJobDiscovery:
 
             if signature not in seen_signatures:
                 seen_signatures.add(signature)
-                unique_jobs.append(job)
-
-        return unique_jobs
+                yield job
 
     def _create_job_signature(self, job: Dict[str, Any]) -> str:
         """Create a unique signature for a job to detect duplicates."""
@@ -225,50 +412,47 @@ class AIJobDiscovery:
         while True:
             print(f"🔄 Discovering new jobs for: {search_term}")
 
-            jobs = self.discover_jobs(search_term, location)
+            # Fetch, validate, save and embed in one streaming pass
+            result = self.ingest_jobs(search_term, location)
 
-            # Save to database
-            for job_data in jobs:
-                self._save_job_to_db(job_data)
-
-            print(f"💾 Saved {len(jobs)} new jobs to database")
+            print(f"💾 Saved {result['inserted']} new jobs to database")
             print(f"⏰ Next discovery in {interval_hours} hours...")
 
             # Wait for next run
             import time
             time.sleep(interval_hours * 3600)
 
-    def _save_job_to_db(self, job_data: Dict[str, Any]):
-        """Save discovered job to database."""
-        try:
-            # Check if already exists
-            signature = self._create_job_signature(job_data)
-
-            existing = self.db.query(Job).filter(
-                Job.title == job_data.get("title"),
-                Job.company == job_data.get("company")
-            ).first()
-
-            if existing:
-                return  # Already have this job
-
-            # Create new job
-            job = Job(
-                title=job_data.get("title"),
-                company=job_data.get("company"),
-                location=job_data.get("location"),
-                description=job_data.get("description"),
-                url=job_data.get("url"),
-                posted_date=job_data.get("posted_date"),
-                salary_min=job_data.get("salary_min"),
-                salary_max=job_data.get("salary_max"),
-                job_type=job_data.get("job_type"),
-                source=job_data.get("source"),
-            )
+    def save_jobs(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Save discovered jobs with one bulk upsert and a single commit.
 
-            self.db.add(job)
-            self.db.commit()
+        Returns:
+            upsert_jobs result (inserted/updated/unchanged/needs_embedding),
+            with an "error" message if nothing was saved
+        """
+        rows = [
+            {
+                "external_id": job_data.get("external_id"),
+                "title": job_data.get("title"),
+                "company": job_data.get("company"),
+                "location": job_data.get("location"),
+                "description": job_data.get("description"),
+                "job_url": job_data.get("url"),
+                "posted_date": self._as_datetime(job_data.get("posted_date")),
+                "salary_min": job_data.get("salary_min"),
+                "salary_max": job_data.get("salary_max"),
+                "job_type": job_data.get("job_type"),
+                "source": job_data.get("source"),
+            }
+            for job_data in jobs
+            if all(job_data.get(field) for field in ("title", "company", "description", "url", "source"))
+        ]
 
+        try:
+            result = upsert_jobs(self.db, rows)
+            self.db.commit()
+            return result
         except Exception as e:
-            print(f"❌ Failed to save job: {e}")
+            print(f"❌ Failed to save jobs: {e}")
             self.db.rollback()
+            return {"inserted": 0, "updated": 0, "unchanged": 0, "needs_embedding": [], "error": str(e)}
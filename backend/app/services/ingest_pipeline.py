@@ -0,0 +1,159 @@
+"""Streaming, staged pipeline with bounded queues between stages."""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import settings
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+# A stage turns a stream of items into another stream (filter, map or batch)
+Stage = Callable[[Iterator[Any]], Iterable[Any]]
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.received = 0
+        self.emitted = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.first_output_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self, pipeline_start: float) -> Dict[str, Any]:
+        """Counters plus items/sec over the stage's running time."""
+        elapsed = (self.finished_at or time.perf_counter()) - (self.started_at or pipeline_start)
+        return {
+            "stage": self.name,
+            "received": self.received,
+            "emitted": self.emitted,
+            "seconds": round(elapsed, 3),
+            "items_per_sec": round(self.emitted / elapsed, 1) if elapsed > 0 else None,
+            "first_output_after": (
+                round(self.first_output_at - pipeline_start, 3)
+                if self.first_output_at is not None else None
+            ),
+            "error": self.error,
+        }
+
+
+class StreamingPipeline:
+    """
+    Run a source and a chain of stages concurrently, one thread each.
+
+    Stages are connected by bounded queues, so a slow stage applies
+    back-pressure upstream and at most queue_size items are buffered
+    between any two stages. If a stage fails, the pipeline stops and the
+    error is recorded in that stage's stats.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: List[Tuple[str, Stage]],
+        queue_size: int = None,
+        source_name: str = "fetch"
+    ):
+        self.source = source
+        self.stages = stages
+        self.queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+        self.stats = [StageStats(source_name)] + [StageStats(name) for name, _ in stages]
+        self._stop = threading.Event()
+        self._start: Optional[float] = None
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        """Block on a full queue until there is room or the pipeline stops."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _drain(self, q: queue.Queue, stats: StageStats) -> Iterator[Any]:
+        """Iterate a queue until the end-of-stream marker."""
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _DONE:
+                return
+            stats.received += 1
+            yield item
+
+    def _run_stage(self, items: Iterable[Any], out: queue.Queue, stats: StageStats):
+        stats.started_at = time.perf_counter()
+        try:
+            for item in items:
+                if stats.first_output_at is None:
+                    stats.first_output_at = time.perf_counter()
+                stats.emitted += 1
+                if not self._put(out, item):
+                    break
+        except Exception as e:
+            stats.error = str(e)
+            print(f"Pipeline stage '{stats.name}' failed: {e}")
+            self._stop.set()
+        finally:
+            stats.finished_at = time.perf_counter()
+            # The sentinel must get through even when the consumer is slow
+            while True:
+                try:
+                    out.put(_DONE, timeout=0.1)
+                    break
+                except queue.Full:
+                    if self._stop.is_set():
+                        break
+
+    def run(self) -> Iterator[Any]:
+        """Start every stage and yield the output of the last one."""
+        self._start = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        threads = [threading.Thread(
+            target=self._run_stage,
+            args=(self.source, queues[0], self.stats[0]),
+            daemon=True
+        )]
+        for i, (_, stage) in enumerate(self.stages):
+            stats = self.stats[i + 1]
+            threads.append(threading.Thread(
+                target=self._run_stage,
+                args=(stage(self._drain(queues[i], stats)), queues[i + 1], stats),
+                daemon=True
+            ))
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            yield from self._drain(queues[-1], StageStats("sink"))
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-stage counters, in pipeline order."""
+        return [stats.to_dict(self._start or time.perf_counter()) for stats in self.stats]
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group a stream into lists of at most size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
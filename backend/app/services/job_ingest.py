@@ -0,0 +1,218 @@
+"""Bulk ingestion of scraped jobs."""
+import hashlib
+import json
+import math
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import func, literal_column, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.job import Job
+from app.services.near_duplicates import near_duplicate_index
+from app.services.response_cache import invalidate_jobs
+
+# Columns a scraper may set; everything else is owned by the app
+INGEST_COLUMNS = (
+    "external_id", "title", "company", "location", "job_url", "source",
+    "description", "salary_min", "salary_max", "job_type",
+    "experience_level", "required_skills", "posted_date",
+)
+
+# Fields whose change means the posting itself changed
+HASHED_COLUMNS = (
+    "title", "company", "location", "description",
+    "salary_min", "salary_max", "job_type", "posted_date",
+)
+
+
+def _clean(value: Any) -> Any:
+    """Turn pandas NaN into None so it hashes and stores as NULL."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def content_hash(job_data: Dict[str, Any]) -> str:
+    """SHA-256 over the fields that define a posting's content."""
+    payload = {column: job_data.get(column) for column in HASHED_COLUMNS}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _prepare_rows(jobs_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep ingestable columns, drop rows without an external_id and dedupe (last wins)."""
+    rows = {}
+    for job_data in jobs_data:
+        if not job_data.get("external_id"):
+            continue
+        row = {column: _clean(job_data.get(column)) for column in INGEST_COLUMNS}
+        row["content_hash"] = content_hash(row)
+        rows[row["external_id"]] = row
+    return list(rows.values())
+
+
+def upsert_jobs(
+    db: Session,
+    jobs_data: List[Dict[str, Any]],
+    batch_size: int = None
+) -> Dict[str, Any]:
+    """
+    Insert or update scraped jobs with INSERT ... ON CONFLICT (external_id).
+
+    Existing rows are only rewritten when their content hash changed.
+    Unchanged canonical jobs that still lack an embedding are reported as
+    needing one too.
+    Near-duplicates of a stored or earlier job (MinHash LSH over the
+    description) are saved linked to that canonical job, and only
+    canonical rows that were inserted or rewritten are reported as
+    needing embeddings. The caller commits.
+
+    Args:
+        db: Database session
+        jobs_data: Job dicts as produced by the scrapers
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        Dict with inserted/updated/unchanged/near_duplicates counts and the
+        IDs of jobs that need embeddings
+    """
+    batch_size = batch_size or settings.JOB_UPSERT_BATCH_SIZE
+    rows = _prepare_rows(jobs_data)
+
+    inserted, updated, duplicates, needs_embedding = 0, 0, 0, []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        references = near_duplicate_index.assign(db, batch)
+
+        # Canonical rows go first so in-batch duplicates can point at their IDs
+        canonical_rows = [row for row, ref in zip(batch, references) if ref is None]
+        duplicate_rows = [(row, ref) for row, ref in zip(batch, references) if ref is not None]
+        for row in canonical_rows:
+            row["canonical_job_id"] = None
+        changed = _upsert_batch(db, canonical_rows)
+
+        batch_refs = [ref[4:] for _, ref in duplicate_rows if ref.startswith("ext:")]
+        batch_ids = dict(
+            db.query(Job.external_id, Job.id).filter(Job.external_id.in_(batch_refs)).all()
+        ) if batch_refs else {}
+        for row, ref in duplicate_rows:
+            row["canonical_job_id"] = int(ref[3:]) if ref.startswith("id:") else batch_ids.get(ref[4:])
+        changed_duplicates = _upsert_batch(db, [row for row, _ in duplicate_rows])
+
+        # Only canonical jobs are bucketed and embedded
+        minhashes = {row["external_id"]: row["minhash"] for row in canonical_rows}
+        near_duplicate_index.index_jobs(db, {
+            **{job_id: minhashes[external_id] for job_id, external_id, _ in changed},
+            **{job_id: None for job_id, _, _ in changed_duplicates},
+        })
+
+        for job_id, _, was_inserted in changed + changed_duplicates:
+            if was_inserted:
+                inserted += 1
+            else:
+                updated += 1
+        needs_embedding.extend(job_id for job_id, _, _ in changed)
+
+        # Unchanged jobs whose earlier embedding run failed still need one
+        changed_ids = {external_id for _, external_id, _ in changed}
+        unchanged_ids = [row["external_id"] for row in canonical_rows if row["external_id"] not in changed_ids]
+        if unchanged_ids:
+            needs_embedding.extend(job_id for job_id, in db.query(Job.id).filter(
+                Job.external_id.in_(unchanged_ids),
+                Job.embedding_id.is_(None),
+                Job.canonical_job_id.is_(None)
+            ))
+        duplicates += len(duplicate_rows)
+
+        # Cached job reads are dropped once the caller commits
+        if changed or changed_duplicates:
+            invalidate_jobs(db, [job_id for job_id, _, _ in changed + changed_duplicates])
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": len(rows) - inserted - updated,
+        "near_duplicates": duplicates,
+        "needs_embedding": needs_embedding,
+    }
+
+
+def _upsert_batch(db: Session, rows: List[Dict[str, Any]]) -> List[Tuple[int, str, bool]]:
+    """One INSERT ... ON CONFLICT for rows; returns (id, external_id, inserted) of changed rows."""
+    if not rows:
+        return []
+
+    stmt = insert(Job).values(rows)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Job.external_id],
+        set_={
+            **{column: excluded[column] for column in INGEST_COLUMNS if column != "external_id"},
+            "content_hash": excluded.content_hash,
+            "minhash": excluded.minhash,
+            "canonical_job_id": excluded.canonical_job_id,
+            "updated_at": func.now(),
+        },
+        where=Job.content_hash.is_distinct_from(excluded.content_hash)
+    ).returning(Job.id, Job.external_id, literal_column("xmax = 0"))
+
+    # Rows whose hash matched are skipped by the WHERE and not returned;
+    # xmax is 0 only for freshly inserted tuples
+    return [tuple(row) for row in db.execute(stmt)]
+
+
+def jobs_missing_embeddings(db: Session, limit: int = None) -> List[int]:
+    """
+    IDs of canonical jobs that have no embedding yet, newest first.
+
+    Jobs whose embedding failed after their upsert was committed are stored
+    with an unchanged content hash; this lets scrape runs back-fill them.
+    """
+    limit = limit or settings.EMBED_BACKFILL_LIMIT
+    return [
+        job_id for job_id, in db.query(Job.id).filter(
+            Job.embedding_id.is_(None),
+            Job.canonical_job_id.is_(None)
+        ).order_by(Job.id.desc()).limit(limit)
+    ]
+
+
+def embed_jobs(db: Session, job_ids: List[int]) -> int:
+    """
+    Embed the given jobs in one batch and record their embedding IDs.
+
+    A changed posting gets a new point ID and its old point is deleted, so
+    vectors cached by embedding ID in other processes are never stale.
+
+    Returns:
+        Number of jobs embedded
+    """
+    from app.ml.embeddings import embedding_service
+
+    if not job_ids:
+        return 0
+
+    jobs = db.query(
+        Job.id, Job.title, Job.company, Job.location, Job.description, Job.embedding_id
+    ).filter(Job.id.in_(job_ids)).all()
+
+    embedding_ids = embedding_service.store_job_embeddings([
+        {
+            "job_id": job.id,
+            "embedding_id": job.embedding_id,
+            "text": job.description,
+            "metadata": {
+                "title": job.title,
+                "company": job.company,
+                "location": job.location
+            }
+        }
+        for job in jobs
+    ])
+
+    db.execute(update(Job), [
+        {"id": job.id, "embedding_id": embedding_id}
+        for job, embedding_id in zip(jobs, embedding_ids)
+    ])
+    return len(jobs)
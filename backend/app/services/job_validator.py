@@ -1,8 +1,13 @@
 """Job validation service - detect spam and outdated postings."""
-from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+import multiprocessing
 import re
 
+from app.config import settings
+from app.services.skill_extractor import SkillExtractor
+
 
 class JobValidator:
     """Validate job postings to filter spam and old listings."""
@@ -14,6 +19,9 @@ class JobValidator:
         'bitcoin investment', 'forex trading course', 'insurance sales only',
     ]
 
+    # All spam keywords matched in one pass
+    SPAM_MATCHER = SkillExtractor(SPAM_KEYWORDS)
+
     # Red flag patterns
     RED_FLAGS = [
         r'\$\d{3,},?\d{3}[+]?\s*(per|a)\s*(week|day)',  # Unrealistic salary
@@ -23,6 +31,12 @@ class JobValidator:
         r'cashier.*check',
     ]
 
+    # Searched on lower-cased text: without IGNORECASE each pattern keeps
+    # re's literal-prefix scan, which beats one combined alternation
+    RED_FLAG_PATTERNS = [re.compile(p) for p in RED_FLAGS]
+
+    INVALID_COMPANIES = frozenset(['n/a', 'none', 'unknown'])
+
     def __init__(self):
         """Initialize validator."""
         pass
@@ -46,25 +60,27 @@ class JobValidator:
         is_outdated = False
 
         # Check for spam keywords
-        description = (job_data.get('description', '') + ' ' +
-                      job_data.get('title', '')).lower()
+        description = ((job_data.get('description') or '') + ' ' +
+                       (job_data.get('title') or '')).lower()
 
-        for keyword in self.SPAM_KEYWORDS:
-            if keyword in description:
+        # Plain substring checks rule out the usual clean posting cheaply;
+        # the word-boundary matcher only runs when one of them hits
+        if any(keyword in description for keyword in self.SPAM_KEYWORDS):
+            for keyword in self.SPAM_MATCHER.extract(description):
                 is_spam = True
                 warnings.append(f"Spam keyword detected: {keyword}")
 
         # Check red flag patterns
-        for pattern in self.RED_FLAGS:
-            if re.search(pattern, description, re.IGNORECASE):
+        for pattern in self.RED_FLAG_PATTERNS:
+            if pattern.search(description):
                 is_spam = True
                 warnings.append(f"Suspicious pattern detected")
 
         # Check for missing critical info
-        if not job_data.get('company') or job_data.get('company', '').lower() in ['n/a', 'none', 'unknown']:
+        if not job_data.get('company') or job_data['company'].lower() in self.INVALID_COMPANIES:
             warnings.append("Missing or invalid company name")
 
-        if not job_data.get('description') or len(job_data.get('description', '')) < 100:
+        if not job_data.get('description') or len(job_data['description']) < 100:
             warnings.append("Job description too short or missing")
 
         # Check job age
@@ -103,24 +119,68 @@ class JobValidator:
             "age_days": age_days
         }
 
-    def _calculate_job_age(self, posted_date) -> int:
+    def _calculate_job_age(self, posted_date) -> Optional[int]:
         """Calculate how many days old a job posting is."""
         if not posted_date:
             return None
 
         if isinstance(posted_date, str):
-            try:
-                from dateutil import parser
-                posted_date = parser.parse(posted_date)
-            except:
-                return None
+            posted_date = self._parse_date(posted_date)
 
         if isinstance(posted_date, datetime):
-            age = datetime.now() - posted_date
-            return age.days
+            # Compare aware dates in UTC and naive dates in local time
+            now = datetime.now(timezone.utc) if posted_date.tzinfo else datetime.now()
+            return (now - posted_date).days
+
+        if isinstance(posted_date, date):
+            return (date.today() - posted_date).days
 
         return None
 
+    @staticmethod
+    def _parse_date(value: str) -> Optional[datetime]:
+        """Parse a date string: ISO 8601 fast path, dateutil for anything else."""
+        try:
+            return datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        except ValueError:
+            pass
+
+        try:
+            from dateutil import parser
+            return parser.parse(value)
+        except (ValueError, OverflowError, ImportError):
+            return None
+
+    def validate_jobs(
+        self,
+        jobs: List[Dict[str, Any]],
+        workers: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Validate many job postings.
+
+        Batches of at least VALIDATE_PARALLEL_MIN_JOBS are split into chunks
+        and validated in a process pool of `workers` processes (default:
+        VALIDATE_WORKERS; 0 or 1 validates in-process).
+
+        Returns:
+            Validation results, in the same order as jobs
+        """
+        workers = settings.VALIDATE_WORKERS if workers is None else workers
+        if workers <= 1 or len(jobs) < settings.VALIDATE_PARALLEL_MIN_JOBS:
+            return [self.validate_job(job) for job in jobs]
+
+        chunk_size = settings.VALIDATE_CHUNK_SIZE
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+        # Spawn, not fork: this runs on threads of the API and Celery processes
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return [
+                validation
+                for results in pool.map(validate_job_batch, chunks)
+                for validation in results
+            ]
+
     def filter_spam_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Filter out spam and low-quality jobs.
@@ -130,9 +190,7 @@ class JobValidator:
         """
         validated_jobs = []
 
-        for job in jobs:
-            validation = self.validate_job(job)
-
+        for job, validation in zip(jobs, self.validate_jobs(jobs)):
             # Add validation data to job
             job['validation'] = validation
 
@@ -158,3 +216,8 @@ class JobValidator:
 
 # Singleton
 job_validator = JobValidator()
+
+
+def validate_job_batch(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate a chunk of jobs; module-level so process pools can pickle it."""
+    return [job_validator.validate_job(job) for job in jobs]
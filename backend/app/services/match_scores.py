@@ -0,0 +1,94 @@
+"""Atomic writes of resume-job match scores."""
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.match_score import MatchScore
+from app.services.response_cache import invalidate_matches
+
+# Columns a match result may set; ids and timestamps are owned by the app
+SCORE_COLUMNS = (
+    "overall_score", "keyword_score", "semantic_score", "experience_score",
+    "education_score", "location_score", "matched_skills", "missing_skills",
+    "strengths", "gaps", "suggestions",
+)
+
+
+def upsert_match_score(
+    db: Session,
+    resume_id: int,
+    job_id: int,
+    match_result: Dict[str, Any]
+) -> int:
+    """
+    Insert or update the score of one resume-job pair.
+
+    Args:
+        db: Database session
+        resume_id: Resume ID
+        job_id: Job ID
+        match_result: Output of MatchingEngine.match_resume_to_job, optionally
+            with suggestions
+
+    Returns:
+        ID of the match_scores row
+    """
+    return upsert_match_scores(db, [(resume_id, job_id, match_result)])[0]
+
+
+def upsert_match_scores(
+    db: Session,
+    scores: Iterable[Tuple[int, int, Dict[str, Any]]],
+    batch_size: int = None
+) -> List[int]:
+    """
+    Insert or update many scores with INSERT ... ON CONFLICT (resume_id, job_id).
+
+    Concurrent writers of the same pair end up with one row holding the
+    last write instead of duplicates. Only the columns present in a result
+    are written, so rescoring keeps stored suggestions. Cached match
+    listings of the affected resumes are dropped once the caller commits.
+
+    Args:
+        db: Database session
+        scores: (resume_id, job_id, match_result) triples
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        Row IDs, one per distinct pair in input order (a pair given twice
+        keeps its last result)
+    """
+    batch_size = batch_size or settings.MATCH_UPSERT_BATCH_SIZE
+
+    # One statement can't touch the same row twice, so dedupe (last wins)
+    rows: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for resume_id, job_id, match_result in scores:
+        row = {column: match_result[column] for column in SCORE_COLUMNS if column in match_result}
+        rows[(resume_id, job_id)] = {"resume_id": resume_id, "job_id": job_id, **row}
+    if not rows:
+        return []
+
+    # Multi-row VALUES needs the same columns in every row
+    by_columns: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows.values():
+        by_columns.setdefault(tuple(row), []).append(row)
+
+    ids: Dict[Tuple[int, int], int] = {}
+    for columns, group in by_columns.items():
+        for start in range(0, len(group), batch_size):
+            stmt = insert(MatchScore).values(group[start:start + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[MatchScore.resume_id, MatchScore.job_id],
+                set_={
+                    **{column: stmt.excluded[column] for column in columns[2:]},
+                    "updated_at": func.now(),
+                }
+            ).returning(MatchScore.id, MatchScore.resume_id, MatchScore.job_id)
+            for match_id, resume_id, job_id in db.execute(stmt):
+                ids[(resume_id, job_id)] = match_id
+
+    invalidate_matches(db, {resume_id for resume_id, _ in rows})
+    return [ids[pair] for pair in rows]
@@ -0,0 +1,237 @@
+"""Near-duplicate job detection with MinHash signatures and LSH banding."""
+import hashlib
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.job import Job
+from app.models.job_lsh_bucket import JobLshBucket
+from app.services.response_cache import invalidate_jobs
+
+# Mersenne prime for the universal hash family; a * x stays below 2**62
+_PRIME = (1 << 31) - 1
+_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles of job descriptions.
+
+    Two signatures agree in a given slot with probability equal to the
+    Jaccard similarity of the shingle sets, so the fraction of equal slots
+    estimates similarity. Splitting a signature into bands and hashing
+    each band gives LSH buckets: near-duplicates share at least one bucket
+    with high probability, so candidates are found by bucket lookup
+    instead of comparing against every job.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = None,
+        bands: int = None,
+        shingle_size: int = None,
+        seed: int = 1
+    ):
+        self.num_perm = num_perm or settings.DEDUP_NUM_PERM
+        self.bands = bands or settings.DEDUP_LSH_BANDS
+        self.shingle_size = shingle_size or settings.DEDUP_SHINGLE_SIZE
+        if self.num_perm % self.bands:
+            raise ValueError("DEDUP_NUM_PERM must be a multiple of DEDUP_LSH_BANDS")
+        self.rows = self.num_perm // self.bands
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=self.num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=self.num_perm).astype(np.uint64)
+
+    def shingles(self, text: str) -> set:
+        """Hashed word k-grams of the lower-cased text."""
+        words = _WORD_PATTERN.findall((text or "").lower())
+        if not words:
+            return set()
+        k = min(self.shingle_size, len(words))
+        return {
+            zlib.crc32(" ".join(words[i:i + k]).encode()) % _PRIME
+            for i in range(len(words) - k + 1)
+        }
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature (uint32 array of num_perm) or None for empty text."""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        hashed = (np.outer(values, self._a) + self._b) % _PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def buckets(self, signature: np.ndarray) -> List[str]:
+        """One LSH bucket key per band: '<band>:<hash of band rows>'."""
+        return [
+            f"{band}:{hashlib.md5(signature[band * self.rows:(band + 1) * self.rows].tobytes()).hexdigest()[:16]}"
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(left: np.ndarray, right: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(left == right))
+
+    @staticmethod
+    def to_bytes(signature: Optional[np.ndarray]) -> Optional[bytes]:
+        return signature.tobytes() if signature is not None else None
+
+    @staticmethod
+    def from_bytes(data: Optional[bytes]) -> Optional[np.ndarray]:
+        return np.frombuffer(data, dtype=np.uint32) if data else None
+
+
+class NearDuplicateIndex:
+    """
+    Resolve canonical jobs for a batch of incoming postings.
+
+    Canonical jobs (canonical_job_id IS NULL) have their LSH buckets stored
+    in job_lsh_buckets. Each batch does one bucket lookup for all its rows,
+    one load of the candidate signatures, and also matches rows against
+    earlier rows of the same batch.
+    """
+
+    def __init__(self, hasher: MinHasher = None, threshold: float = None):
+        self.hasher = hasher or MinHasher()
+        self.threshold = threshold if threshold is not None else settings.DEDUP_SIMILARITY_THRESHOLD
+
+    def assign(self, db: Session, rows: List[Dict]) -> List[Optional[str]]:
+        """
+        Compute signatures for rows and find each row's canonical.
+
+        Sets row["minhash"] on every row and returns, per row, either None
+        (the row is canonical) or a reference to its canonical: "id:<job id>"
+        for a stored job or "ext:<external_id>" for an earlier row of the
+        same batch.
+        """
+        signatures = [self.hasher.signature(row.get("description")) for row in rows]
+        row_buckets = [self.hasher.buckets(sig) if sig is not None else [] for sig in signatures]
+        for row, signature in zip(rows, signatures):
+            row["minhash"] = self.hasher.to_bytes(signature)
+
+        stored = self._load_candidates(db, {bucket for buckets in row_buckets for bucket in buckets})
+
+        canonicals: List[Optional[str]] = []
+        batch_buckets: Dict[str, List[int]] = {}
+        for i, (row, signature, buckets) in enumerate(zip(rows, signatures, row_buckets)):
+            if signature is None:
+                canonicals.append(None)
+                continue
+
+            best, best_score = None, self.threshold
+            for bucket in buckets:
+                for job_id, external_id, candidate in stored["buckets"].get(bucket, ()):
+                    if external_id == row["external_id"]:
+                        continue
+                    score = self.hasher.similarity(signature, candidate)
+                    if score >= best_score:
+                        best, best_score = f"id:{job_id}", score
+                for j in batch_buckets.get(bucket, ()):
+                    score = self.hasher.similarity(signature, signatures[j])
+                    if score >= best_score:
+                        best, best_score = f"ext:{rows[j]['external_id']}", score
+
+            canonicals.append(best)
+            if best is None:
+                for bucket in buckets:
+                    batch_buckets.setdefault(bucket, []).append(i)
+
+        return canonicals
+
+    def _load_candidates(self, db: Session, buckets: Iterable[str]) -> Dict:
+        """Canonical jobs sharing any of the buckets, with their signatures."""
+        buckets = list(buckets)
+        if not buckets:
+            return {"buckets": {}}
+
+        hits = db.query(JobLshBucket.bucket, JobLshBucket.job_id).filter(
+            JobLshBucket.bucket.in_(buckets)
+        ).all()
+        job_ids = {job_id for _, job_id in hits}
+        if not job_ids:
+            return {"buckets": {}}
+
+        jobs = {
+            job.id: (job.external_id, self.hasher.from_bytes(job.minhash))
+            for job in db.query(Job.id, Job.external_id, Job.minhash).filter(
+                Job.id.in_(job_ids),
+                Job.canonical_job_id.is_(None)
+            )
+        }
+
+        by_bucket: Dict[str, list] = {}
+        for bucket, job_id in hits:
+            if job_id in jobs and jobs[job_id][1] is not None:
+                by_bucket.setdefault(bucket, []).append((job_id, *jobs[job_id]))
+        return {"buckets": by_bucket}
+
+    def index_jobs(self, db: Session, jobs: Dict[int, Optional[bytes]]):
+        """Replace the stored buckets of canonical jobs (job id -> minhash bytes)."""
+        if not jobs:
+            return
+
+        db.query(JobLshBucket).filter(
+            JobLshBucket.job_id.in_(list(jobs))
+        ).delete(synchronize_session=False)
+
+        entries = [
+            {"job_id": job_id, "bucket": bucket}
+            for job_id, minhash in jobs.items()
+            if minhash
+            for bucket in self.hasher.buckets(self.hasher.from_bytes(minhash))
+        ]
+        if entries:
+            db.execute(JobLshBucket.__table__.insert(), entries)
+
+    def backfill_batch(self, db: Session, after_id: int = 0, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Sign and bucket the next batch of jobs that have no MinHash yet.
+
+        Jobs stored before near-duplicate detection existed are invisible to
+        it. Running this over the corpus in ID order (so the oldest posting
+        stays canonical) links existing duplicates and indexes the
+        canonical jobs for future ingests. The caller commits.
+
+        Returns:
+            Dict with the last processed job ID, jobs processed and jobs linked
+        """
+        jobs = db.query(Job.id, Job.external_id, Job.description).filter(
+            Job.id > after_id,
+            Job.minhash.is_(None),
+            Job.canonical_job_id.is_(None)
+        ).order_by(Job.id).limit(batch_size).all()
+        if not jobs:
+            return {"last_id": after_id, "processed": 0, "linked": 0}
+
+        rows = [{"external_id": job.external_id, "description": job.description} for job in jobs]
+        references = self.assign(db, rows)
+        ids = {job.external_id: job.id for job in jobs}
+
+        updates, canonical, linked = [], {}, []
+        for job, row, ref in zip(jobs, rows, references):
+            canonical_job_id = None
+            if ref is not None:
+                canonical_job_id = int(ref[3:]) if ref.startswith("id:") else ids[ref[4:]]
+                linked.append(job.id)
+            else:
+                canonical[job.id] = row["minhash"]
+            updates.append({"id": job.id, "minhash": row["minhash"], "canonical_job_id": canonical_job_id})
+
+        db.execute(update(Job), updates)
+        self.index_jobs(db, canonical)
+        if linked:
+            invalidate_jobs(db, linked)
+
+        return {"last_id": jobs[-1].id, "processed": len(jobs), "linked": len(linked)}
+
+
+# Singleton instance
+near_duplicate_index = NearDuplicateIndex()
@@ -0,0 +1,23 @@
+"""
+Run pyresparser on one file and print its result as JSON.
+
+Subprocess entry point for the parser's pyresparser fallback:
+    python -m app.services.pyresparser_worker <file_path>
+"""
+import contextlib
+import json
+import sys
+
+
+def main(file_path: str):
+    from pyresparser import ResumeParser
+
+    # pyresparser and its NLP stack log to stdout; keep stdout for the result
+    with contextlib.redirect_stdout(sys.stderr):
+        data = ResumeParser(file_path).get_extracted_data() or {}
+
+    json.dump(data, sys.stdout, default=str)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -0,0 +1,254 @@
+"""Redis-backed cache for read-heavy API responses."""
+import asyncio
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_session
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+# Pending invalidations are kept on the session until it commits
+_PENDING_KEY = "response_cache_invalidations"
+
+# Invalidations scheduled from the commit hook of an async session (the
+# loop only keeps weak references to tasks)
+_background_invalidations = set()
+
+
+class ResponseCache:
+    """
+    Cache JSON responses in Redis, keyed by route namespace and parameters.
+
+    Every (namespace, scope) pair has a generation counter that is part of
+    each cached key, e.g. the job list ("jobs"), one job ("job", job_id) or
+    one resume's matches ("matches", resume_id). Invalidating bumps the
+    counter, so stale entries are never read again and simply expire by
+    TTL. Reads and invalidations from async endpoints use the async
+    client; sync code (ingest, Celery, sync session commit hooks) uses the
+    sync client. Redis errors count as misses.
+    """
+
+    def __init__(self, url: str = None, enabled: bool = None):
+        self.url = url or settings.REDIS_URL
+        self.enabled = settings.RESPONSE_CACHE_ENABLED if enabled is None else enabled
+        self._async_client = None
+        self._sync_client = None
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "errors": 0})
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            import redis.asyncio
+            self._async_client = redis.asyncio.Redis.from_url(
+                self.url, socket_connect_timeout=1, socket_timeout=1
+            )
+        return self._async_client
+
+    @property
+    def sync_client(self):
+        if self._sync_client is None:
+            import redis
+            self._sync_client = redis.Redis.from_url(
+                self.url, socket_connect_timeout=1, socket_timeout=1
+            )
+        return self._sync_client
+
+    @staticmethod
+    def _generation_key(namespace: str, scope: Any = None) -> str:
+        return f"rc:gen:{namespace}" if scope is None else f"rc:gen:{namespace}:{scope}"
+
+    @staticmethod
+    def _entry_key(namespace: str, scope: Any, generation: int, params: Dict[str, Any]) -> str:
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:32]
+        return f"rc:{namespace}:{scope}:{generation}:{digest}"
+
+    def _count(self, namespace: str, outcome: str):
+        with self._lock:
+            self._stats[namespace][outcome] += 1
+
+    async def get(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        scope: Any = None
+    ) -> Tuple[Optional[Any], Optional[int]]:
+        """
+        Look up a cached response.
+
+        Args:
+            namespace: Route family (jobs, job, matches)
+            params: Request parameters that shape the response
+            scope: Entity the response belongs to, for targeted invalidation
+
+        Returns:
+            (cached JSON-compatible response or None on a miss, generation
+            the lookup ran against; pass it to set() when storing the miss)
+        """
+        if not self.enabled:
+            return None, None
+
+        try:
+            generation = int(await self.async_client.get(self._generation_key(namespace, scope)) or 0)
+            data = await self.async_client.get(self._entry_key(namespace, scope, generation, params))
+        except Exception as e:
+            self._count(namespace, "errors")
+            print(f"Response cache read failed: {e}")
+            return None, None
+
+        if data is None:
+            self._count(namespace, "misses")
+            return None, generation
+
+        self._count(namespace, "hits")
+        return json.loads(data), generation
+
+    async def set(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        response: Any,
+        ttl: int,
+        scope: Any = None,
+        generation: Optional[int] = None
+    ) -> Any:
+        """
+        Store a response and return it in its JSON-compatible form.
+
+        The entry is written under the generation get() returned before the
+        response was computed. If an invalidation committed in between,
+        that generation is already stale, so a response built from
+        pre-commit data is never served. Nothing is stored without a
+        generation (cache disabled or the lookup failed).
+        """
+        response = jsonable_encoder(response)
+        if not self.enabled or generation is None:
+            return response
+
+        try:
+            await self.async_client.set(
+                self._entry_key(namespace, scope, generation, params),
+                json.dumps(response),
+                ex=ttl
+            )
+        except Exception as e:
+            self._count(namespace, "errors")
+            print(f"Response cache write failed: {e}")
+        return response
+
+    def invalidate(self, namespace: str, scopes: Iterable[Any] = (None,)):
+        """Bump the generation of each (namespace, scope) so cached entries go stale."""
+        self.invalidate_many([(namespace, scope) for scope in scopes])
+
+    def invalidate_many(self, targets: List[Tuple[str, Any]]):
+        """Bump the generation of each (namespace, scope) in one sync pipeline."""
+        if not self.enabled or not targets:
+            return
+
+        try:
+            pipe = self.sync_client.pipeline(transaction=False)
+            for namespace, scope in targets:
+                pipe.incr(self._generation_key(namespace, scope))
+            pipe.execute()
+        except Exception as e:
+            self._count_errors(targets)
+            print(f"Response cache invalidation failed: {e}")
+
+    async def ainvalidate_many(self, targets: List[Tuple[str, Any]]):
+        """invalidate_many on the async client, for code on the event loop."""
+        if not self.enabled or not targets:
+            return
+
+        try:
+            pipe = self.async_client.pipeline(transaction=False)
+            for namespace, scope in targets:
+                pipe.incr(self._generation_key(namespace, scope))
+            await pipe.execute()
+        except Exception as e:
+            self._count_errors(targets)
+            print(f"Response cache invalidation failed: {e}")
+
+    def _count_errors(self, targets: List[Tuple[str, Any]]):
+        for namespace in {namespace for namespace, _ in targets}:
+            self._count(namespace, "errors")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/error counts and hit ratio per namespace for this process."""
+        with self._lock:
+            stats = {namespace: dict(counts) for namespace, counts in self._stats.items()}
+
+        for counts in stats.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_ratio"] = round(counts["hits"] / lookups, 3) if lookups else None
+        return stats
+
+
+# Singleton instance
+response_cache = ResponseCache()
+
+
+def invalidate_jobs(db: Session, job_ids: Iterable[int] = ()):
+    """Drop cached job lists and the given jobs' details once db commits."""
+    pending = db.info.setdefault(_PENDING_KEY, {"jobs": False, "job": set(), "matches": set()})
+    pending["jobs"] = True
+    pending["job"].update(job_ids)
+
+
+def invalidate_matches(db: Session, resume_ids: Iterable[int]):
+    """Drop cached match listings of the given resumes once db commits."""
+    pending = db.info.setdefault(_PENDING_KEY, {"jobs": False, "job": set(), "matches": set()})
+    pending["matches"].update(resume_ids)
+
+
+def _pending_targets(pending: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """(namespace, scope) pairs to bump for a session's pending invalidations."""
+    targets = [("jobs", None)] if pending["jobs"] else []
+    targets += [("job", job_id) for job_id in pending["job"]]
+    targets += [("matches", resume_id) for resume_id in pending["matches"]]
+    return targets
+
+
+async def commit_and_invalidate(db: AsyncSession):
+    """
+    Commit an async session, then apply its pending invalidations.
+
+    Async endpoints commit through this instead of db.commit(), so the
+    generation bumps go through the async Redis client rather than the
+    blocking sync hook. The pending set is taken off the session first, so
+    the after_commit hook finds nothing to do; if the commit fails nothing
+    was written and the invalidations are dropped.
+    """
+    pending = db.info.pop(_PENDING_KEY, None)
+    await db.commit()
+    if pending:
+        await response_cache.ainvalidate_many(_pending_targets(pending))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    """Apply pending invalidations once the writes are visible to readers."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    targets = _pending_targets(pending)
+    if async_session(session) is not None:
+        # An async session committed without commit_and_invalidate: don't
+        # block the event loop on the sync client
+        task = asyncio.get_running_loop().create_task(response_cache.ainvalidate_many(targets))
+        _background_invalidations.add(task)
+        task.add_done_callback(_background_invalidations.discard)
+        return
+
+    response_cache.invalidate_many(targets)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,141 @@
+"""Content-addressed storage and parse-result reuse for uploaded resumes."""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.resume import Resume
+from app.services.resume_parser import PARSER_VERSION
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds MAX_UPLOAD_SIZE."""
+
+
+def store_upload(source: BinaryIO, filename: str, max_bytes: Optional[int] = None) -> Tuple[Path, str]:
+    """
+    Stream an uploaded file to UPLOAD_DIR under its content hash.
+
+    The file is hashed while it is written, then moved to
+    `<sha256><extension>`. Identical files therefore share one copy on disk
+    and never overwrite an unrelated upload with the same name. Copying
+    stops with UploadTooLargeError as soon as max_bytes (default:
+    MAX_UPLOAD_SIZE) is exceeded. The source is usually an UploadFile that
+    Starlette has already received in full, so this only bounds what is
+    stored; /upload refuses oversized request bodies earlier in
+    BodySizeLimitMiddleware.
+
+    Returns:
+        (stored path, sha256 hex digest)
+    """
+    upload_dir = Path(settings.UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    max_bytes = max_bytes or settings.MAX_UPLOAD_SIZE
+
+    hasher = hashlib.sha256()
+    received = 0
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                received += len(chunk)
+                if received > max_bytes:
+                    raise UploadTooLargeError(
+                        f"File exceeds maximum upload size of {max_bytes} bytes"
+                    )
+                hasher.update(chunk)
+                buffer.write(chunk)
+
+        file_hash = hasher.hexdigest()
+        file_path = upload_dir / f"{file_hash}{Path(filename).suffix.lower()}"
+        if file_path.exists():
+            os.unlink(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+    return file_path, file_hash
+
+
+def find_parsed_resumes(db: Session, file_hashes: Iterable[str]) -> Dict[str, Resume]:
+    """Find resumes already parsed by the current parser version, by file hash."""
+    hashes = list(set(file_hashes))
+    if not hashes:
+        return {}
+
+    resumes = db.query(Resume).filter(
+        Resume.file_hash.in_(hashes),
+        Resume.parser_version == PARSER_VERSION
+    ).order_by(Resume.id).all()
+
+    found = {}
+    for resume in resumes:
+        found.setdefault(resume.file_hash, resume)
+    return found
+
+
+def find_parsed_resume(db: Session, file_hash: str) -> Optional[Resume]:
+    """Find a resume already parsed from an identical file."""
+    return find_parsed_resumes(db, [file_hash]).get(file_hash)
+
+
+def build_resume(
+    user_id: int,
+    filename: str,
+    file_path: str,
+    file_hash: Optional[str],
+    parsed_data: Dict[str, Any]
+) -> Resume:
+    """Create a Resume row from freshly parsed data."""
+    return Resume(
+        user_id=user_id,
+        filename=filename,
+        file_path=file_path,
+        file_hash=file_hash,
+        parser_version=PARSER_VERSION,
+        raw_text=parsed_data["raw_text"],
+        parsed_data=parsed_data,
+        skills=parsed_data.get("skills", []),
+        experience_years=parsed_data.get("experience_years"),
+        education=parsed_data.get("education", []),
+    )
+
+
+def reuse_parsed_resume(db: Session, cached: Resume, user_id: int, filename: str) -> Resume:
+    """
+    Reuse a cached parse for a re-uploaded file.
+
+    The same user gets their existing resume back; another user gets a new
+    row that shares the parsed data and embedding. The caller commits.
+    """
+    if cached.user_id == user_id:
+        return cached
+
+    resume = Resume(
+        user_id=user_id,
+        filename=filename,
+        file_path=cached.file_path,
+        file_hash=cached.file_hash,
+        parser_version=cached.parser_version,
+        raw_text=cached.raw_text,
+        parsed_data=cached.parsed_data,
+        skills=cached.skills,
+        experience_years=cached.experience_years,
+        education=cached.education,
+        work_experience=cached.work_experience,
+        embedding_id=cached.embedding_id,
+    )
+    db.add(resume)
+    return resume
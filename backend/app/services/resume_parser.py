@@ -1,49 +1,42 @@
 """Resume parser service using pyresparser and custom extraction logic."""
+import importlib.util
+import json
 import re
-import spacy
-from typing import Dict, List, Optional, Any
+import subprocess
+import sys
+import threading
+import time
+from contextlib import closing, contextmanager
+from typing import Dict, Iterator, List, Optional, Any
 from pathlib import Path
 import PyPDF2
 from docx import Document
-from pyresparser import ResumeParser
+
+from app.config import settings
+from app.services.skill_extractor import TECH_SKILLS, skill_extractor
+
+# Bump whenever extraction changes so cached parse results are not reused
+PARSER_VERSION = "4"
+
+TEXT_CHUNK_SIZE = 64 * 1024  # Characters read per plain text chunk
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(\+?\d{1,3}[-.]?)?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}')
 
 
 class EnhancedResumeParser:
     """Enhanced resume parser with custom NLP extraction."""
 
+    # Only NER is used; the ner pipe in en_core_web_sm has its own tok2vec layer
+    DISABLED_PIPES = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
     def __init__(self):
-        """Initialize parser with spaCy model."""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            # Model not found, download it
-            import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-            self.nlp = spacy.load("en_core_web_sm")
-
-        # Tech skills database (expandable)
-        self.tech_skills = {
-            # Programming Languages
-            "python", "java", "javascript", "typescript", "c++", "c#", "ruby", "go", "rust",
-            "php", "swift", "kotlin", "scala", "r", "matlab", "sql",
-
-            # Frameworks & Libraries
-            "react", "angular", "vue", "node.js", "express", "fastapi", "django", "flask",
-            "spring", "spring boot", "pytorch", "tensorflow", "keras", "scikit-learn",
-            "pandas", "numpy", "matplotlib", "seaborn",
-
-            # Databases
-            "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "cassandra",
-            "dynamodb", "bigquery", "snowflake", "oracle",
-
-            # Cloud & DevOps
-            "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "gitlab", "github actions",
-            "terraform", "ansible", "ec2", "s3", "lambda", "rds",
-
-            # Tools & Technologies
-            "git", "linux", "bash", "rest api", "graphql", "microservices", "ci/cd",
-            "agile", "scrum", "jira", "confluence",
-        }
+        """Initialize parser. The spaCy model is loaded on first use."""
+        self._nlp = None
+        self._nlp_lock = threading.Lock()
+
+        # Tech skills database (shared with the job scraper)
+        self.tech_skills = TECH_SKILLS
 
         # Experience level keywords
         self.experience_keywords = {
@@ -52,58 +45,113 @@ class EnhancedResumeParser:
             "senior": ["senior", "lead", "principal", "staff", "architect", "manager"]
         }
 
-    def extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file."""
-        text = ""
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first access."""
+        if self._nlp is None:
+            with self._nlp_lock:
+                if self._nlp is None:
+                    self._nlp = self._load_nlp()
+        return self._nlp
+
+    def _load_nlp(self):
+        """Load the spaCy model, downloading it if missing."""
+        import spacy
+
+        try:
+            return spacy.load("en_core_web_sm", disable=self.DISABLED_PIPES)
+        except OSError:
+            # Model not found, download it
+            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
+            return spacy.load("en_core_web_sm", disable=self.DISABLED_PIPES)
+
+    def warm_up(self):
+        """Load the spaCy model ahead of the first request."""
+        return self.nlp
+
+    def iter_pdf_pages(self, file_path: str, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Yield text page by page from a PDF file, up to max_pages."""
+        max_pages = max_pages or settings.MAX_RESUME_PAGES
         try:
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
+                for page_number, page in enumerate(pdf_reader.pages):
+                    if page_number >= max_pages:
+                        break
+                    yield (page.extract_text() or "") + "\n"
         except Exception as e:
             print(f"Error extracting PDF: {e}")
-        return text
 
-    def extract_text_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX file."""
-        text = ""
+    def iter_docx_paragraphs(self, file_path: str) -> Iterator[str]:
+        """Yield text paragraph by paragraph from a DOCX file."""
         try:
             doc = Document(file_path)
             for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+                yield paragraph.text + "\n"
         except Exception as e:
             print(f"Error extracting DOCX: {e}")
-        return text
 
-    def extract_text(self, file_path: str) -> str:
-        """Extract text from resume file."""
-        file_path_obj = Path(file_path)
-        extension = file_path_obj.suffix.lower()
+    def iter_txt_chunks(self, file_path: str) -> Iterator[str]:
+        """Yield text in fixed-size chunks from a plain text file."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            while True:
+                chunk = f.read(TEXT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def iter_text_chunks(self, file_path: str) -> Iterator[str]:
+        """Yield text chunks (pages, paragraphs or blocks) from a resume file."""
+        extension = Path(file_path).suffix.lower()
 
         if extension == '.pdf':
-            return self.extract_text_from_pdf(file_path)
+            return self.iter_pdf_pages(file_path)
         elif extension in ['.docx', '.doc']:
-            return self.extract_text_from_docx(file_path)
+            return self.iter_docx_paragraphs(file_path)
         elif extension == '.txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return self.iter_txt_chunks(file_path)
         else:
             raise ValueError(f"Unsupported file format: {extension}")
 
-    def extract_skills(self, text: str) -> List[str]:
-        """Extract technical skills from resume text."""
-        text_lower = text.lower()
-        found_skills = set()
+    def _join_bounded(self, chunks: Iterator[str], max_chars: Optional[int] = None) -> str:
+        """Join chunks once, stopping as soon as max_chars is reached."""
+        max_chars = max_chars or settings.MAX_RESUME_CHARS
+        parts = []
+        total = 0
+        with closing(chunks):
+            for chunk in chunks:
+                if total + len(chunk) >= max_chars:
+                    parts.append(chunk[:max_chars - total])
+                    break
+                parts.append(chunk)
+                total += len(chunk)
+        return "".join(parts)
+
+    def extract_text_from_pdf(self, file_path: str) -> str:
+        """Extract text from PDF file."""
+        return self._join_bounded(self.iter_pdf_pages(file_path))
+
+    def extract_text_from_docx(self, file_path: str) -> str:
+        """Extract text from DOCX file."""
+        return self._join_bounded(self.iter_docx_paragraphs(file_path))
+
+    def extract_text(self, file_path: str, max_chars: Optional[int] = None) -> str:
+        """
+        Extract text from resume file.
+
+        Pages beyond MAX_RESUME_PAGES and text beyond max_chars (default:
+        MAX_RESUME_CHARS) are never read, so parse cost stays bounded.
+        """
+        return self._join_bounded(self.iter_text_chunks(file_path), max_chars)
 
-        # Extract exact matches
-        for skill in self.tech_skills:
-            # Use word boundaries for better matching
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills.add(skill)
+    def extract_skills(self, text: str, doc=None) -> List[str]:
+        """Extract technical skills from resume text (reuses doc if given)."""
+        # Extract exact matches in a single pass
+        found_skills = set(skill_extractor.extract(text))
 
         # Use spaCy NER for additional skill extraction
-        doc = self.nlp(text)
+        if doc is None:
+            doc = self.nlp(text)
         for ent in doc.ents:
             if ent.label_ in ["PRODUCT", "ORG"]:
                 skill = ent.text.lower()
@@ -172,48 +220,136 @@ class EnhancedResumeParser:
             file_path: Path to resume file
 
         Returns:
-            Dictionary with parsed resume data
+            Dictionary with parsed resume data, including per-stage
+            timings in milliseconds under "timings"
         """
+        timings: Dict[str, float] = {}
+
         # Extract raw text
-        raw_text = self.extract_text(file_path)
+        with _timed(timings, "extract_text"):
+            raw_text = self.extract_text(file_path)
+
+        # Run the NLP pipeline once and share the Doc between extractors
+        with _timed(timings, "nlp"):
+            doc = self.nlp(raw_text)
+
+        return self._parse_document(file_path, raw_text, doc, timings)
+
+    def parse_resumes(
+        self,
+        file_paths: List[str],
+        n_process: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Parse many resumes, batching the NLP pipeline with nlp.pipe.
+
+        Args:
+            file_paths: Paths to resume files
+            n_process: spaCy worker processes (default: SPACY_N_PROCESS)
+            batch_size: Texts per nlp.pipe batch (default: SPACY_BATCH_SIZE)
+
+        Returns:
+            Parsed resume data per file, in input order. Files that fail
+            are returned as {"file_path": ..., "error": ...}.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(file_paths)
+        texts: Dict[int, str] = {}
+        timings: Dict[int, Dict[str, float]] = {}
+
+        for i, file_path in enumerate(file_paths):
+            timings[i] = {}
+            try:
+                with _timed(timings[i], "extract_text"):
+                    texts[i] = self.extract_text(file_path)
+            except Exception as e:
+                results[i] = {"file_path": file_path, "error": str(e)}
+
+        indices = list(texts)
+        docs = self.nlp.pipe(
+            (texts[i] for i in indices),
+            n_process=n_process or settings.SPACY_N_PROCESS,
+            batch_size=batch_size or settings.SPACY_BATCH_SIZE
+        )
+
+        for i, doc in zip(indices, docs):
+            try:
+                results[i] = self._parse_document(file_paths[i], texts[i], doc, timings[i])
+            except Exception as e:
+                results[i] = {"file_path": file_paths[i], "error": str(e)}
+
+        return results
+
+    def _run_pyresparser(self, file_path: str) -> Dict[str, Any]:
+        """
+        Run pyresparser in a subprocess under PYRESPARSER_TIMEOUT_SECONDS.
+
+        pyresparser re-reads the file and runs its own NLP stack, so it is
+        only used to fill fields our own extraction missed. A run that
+        exceeds the budget is killed, so a hung parse costs no CPU past
+        the budget. A plain subprocess (not multiprocessing) also works
+        inside daemonic Celery pool workers. Returns {} if it is disabled,
+        not installed, fails or runs out of time.
+        """
+        if not _pyresparser_installed():
+            return {}
 
-        # Try using pyresparser for basic extraction
-        parsed_basic = {}
         try:
-            parser = ResumeParser(file_path)
-            parsed_basic = parser.get_extracted_data()
+            completed = subprocess.run(
+                [sys.executable, "-m", "app.services.pyresparser_worker", file_path],
+                cwd=_BACKEND_DIR,
+                capture_output=True,
+                timeout=settings.PYRESPARSER_TIMEOUT_SECONDS,
+                check=True
+            )
+            return json.loads(completed.stdout or b"{}")
+        except subprocess.TimeoutExpired:
+            print(f"pyresparser timed out after {settings.PYRESPARSER_TIMEOUT_SECONDS}s. Using custom extraction only.")
+        except subprocess.CalledProcessError as e:
+            error = e.stderr.decode(errors="replace").strip().splitlines()
+            print(f"pyresparser failed: {error[-1] if error else e}. Using custom extraction only.")
         except Exception as e:
             print(f"pyresparser failed: {e}. Using custom extraction only.")
+        return {}
+
+    def _parse_document(
+        self,
+        file_path: str,
+        raw_text: str,
+        doc,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """Build parsed resume data from extracted text and its spaCy Doc."""
+        timings = timings if timings is not None else {}
 
         # Custom extraction
-        skills = self.extract_skills(raw_text)
-        experience_years = self.extract_experience_years(raw_text)
-        education = self.extract_education(raw_text)
-
-        # Use spaCy for name and email extraction if pyresparser failed
-        doc = self.nlp(raw_text)
-
-        name = parsed_basic.get("name")
-        if not name:
+        with _timed(timings, "skills"):
+            skills = self.extract_skills(raw_text, doc=doc)
+        with _timed(timings, "experience"):
+            experience_years = self.extract_experience_years(raw_text)
+        with _timed(timings, "education"):
+            education = self.extract_education(raw_text)
+
+        with _timed(timings, "contact"):
             # Extract first PERSON entity as name
-            for ent in doc.ents:
-                if ent.label_ == "PERSON":
-                    name = ent.text
-                    break
+            name = next((ent.text for ent in doc.ents if ent.label_ == "PERSON"), None)
 
-        email = parsed_basic.get("email")
-        if not email:
             # Extract email with regex
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = re.findall(email_pattern, raw_text)
-            email = emails[0] if emails else None
+            email_match = EMAIL_PATTERN.search(raw_text)
+            email = email_match.group(0) if email_match else None
 
-        phone = parsed_basic.get("mobile_number")
-        if not phone:
             # Extract phone number
-            phone_pattern = r'(\+?\d{1,3}[-.]?)?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}'
-            phones = re.findall(phone_pattern, raw_text)
-            phone = phones[0] if phones else None
+            phone_match = PHONE_PATTERN.search(raw_text)
+            phone = phone_match.group(0) if phone_match else None
+
+        # Only fall back to pyresparser for fields we could not find
+        parsed_basic = {}
+        if settings.PYRESPARSER_ENABLED and not (name and email and phone):
+            with _timed(timings, "pyresparser"):
+                parsed_basic = self._run_pyresparser(file_path)
+            name = name or parsed_basic.get("name")
+            email = email or parsed_basic.get("email")
+            phone = phone or parsed_basic.get("mobile_number")
 
         # Combine all parsed data
         result = {
@@ -225,10 +361,47 @@ class EnhancedResumeParser:
             "education": education,
             "raw_text": raw_text,
             "parsed_basic": parsed_basic,  # Include original pyresparser output
+            "timings": timings,
         }
 
         return result
 
 
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str):
+    """Record a stage's wall time in milliseconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+
+
+# Working directory from which `python -m app...` resolves
+_BACKEND_DIR = str(Path(__file__).resolve().parents[2])
+_pyresparser_found = None
+
+
+def _pyresparser_installed() -> bool:
+    """Whether pyresparser can be imported, checked once without importing it."""
+    global _pyresparser_found
+    if _pyresparser_found is None:
+        _pyresparser_found = importlib.util.find_spec("pyresparser") is not None
+    return _pyresparser_found
+
+
 # Singleton instance
 resume_parser = EnhancedResumeParser()
+
+
+def init_parse_worker():
+    """Process pool initializer: load the spaCy model once per worker."""
+    try:
+        resume_parser.warm_up()
+    except Exception as e:
+        print(f"⚠️ Parser warm-up failed: {e}")
+
+
+def parse_resume_batch(file_paths: List[str]) -> List[Dict[str, Any]]:
+    """Parse a batch of resumes in the current process (process pool entry point)."""
+    return resume_parser.parse_resumes(file_paths, n_process=1)
@@ -0,0 +1,66 @@
+"""Per-query high-water marks for incremental scraping."""
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.scrape_cursor import ScrapeCursor
+
+
+def get_cursor(db: Session, search_term: str, location: str, site: str) -> ScrapeCursor:
+    """
+    Get the cursor for a query, creating it on first use.
+
+    The row is created with INSERT ... ON CONFLICT DO NOTHING, so two first
+    runs of the same query don't fail on uq_scrape_cursor_query; the
+    second waits for the first to commit and then reads its row.
+    """
+    location = location or ""
+    db.execute(
+        insert(ScrapeCursor).values(
+            search_term=search_term,
+            location=location,
+            site=site,
+            known_external_ids=[]
+        ).on_conflict_do_nothing(
+            index_elements=[ScrapeCursor.search_term, ScrapeCursor.location, ScrapeCursor.site]
+        )
+    )
+
+    return db.query(ScrapeCursor).filter(
+        ScrapeCursor.search_term == search_term,
+        ScrapeCursor.location == location,
+        ScrapeCursor.site == site
+    ).one()
+
+
+def window_hours(cursor: ScrapeCursor, max_hours_old: int) -> int:
+    """Hours to request: time since the last run plus overlap, capped at max_hours_old."""
+    if not cursor.last_run_at:
+        return max_hours_old
+
+    last_run_at = cursor.last_run_at
+    if last_run_at.tzinfo is None:
+        last_run_at = last_run_at.replace(tzinfo=timezone.utc)
+
+    elapsed = (datetime.now(timezone.utc) - last_run_at).total_seconds() / 3600
+    hours = math.ceil(elapsed) + settings.SCRAPE_CURSOR_OVERLAP_HOURS
+    return max(1, min(max_hours_old, hours))
+
+
+def advance_cursor(cursor: ScrapeCursor, jobs: List[Dict[str, Any]]):
+    """Record a run: newest posted date and the most recent external IDs."""
+    cursor.last_run_at = datetime.now(timezone.utc)
+
+    posted_dates = [job["posted_date"] for job in jobs if job.get("posted_date")]
+    if posted_dates:
+        newest = max(posted_dates)
+        if not cursor.last_posted_date or newest > cursor.last_posted_date.replace(tzinfo=None):
+            cursor.last_posted_date = newest
+
+    new_ids = [job["external_id"] for job in jobs if job.get("external_id")]
+    known = list(dict.fromkeys(new_ids + (cursor.known_external_ids or [])))
+    cursor.known_external_ids = known[:settings.SCRAPE_CURSOR_KNOWN_IDS]
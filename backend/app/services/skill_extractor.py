@@ -0,0 +1,115 @@
+"""Shared skill taxonomy and single-pass phrase extraction."""
+import re
+from typing import Dict, Iterable, List
+
+
+# Tech skills database (expandable)
+TECH_SKILLS = frozenset({
+    # Programming Languages
+    "python", "java", "javascript", "typescript", "c++", "c#", "ruby", "go", "rust",
+    "php", "swift", "kotlin", "scala", "r", "matlab", "sql",
+
+    # Frameworks & Libraries
+    "react", "angular", "vue", "node.js", "express", "fastapi", "django", "flask",
+    "spring", "spring boot", "pytorch", "tensorflow", "keras", "scikit-learn", "sklearn",
+    "pandas", "numpy", "matplotlib", "seaborn",
+
+    # Databases
+    "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "cassandra",
+    "dynamodb", "bigquery", "snowflake", "oracle",
+
+    # Cloud & DevOps
+    "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "gitlab", "github actions",
+    "terraform", "ansible", "ec2", "s3", "lambda", "rds",
+
+    # Tools & Technologies
+    "git", "linux", "bash", "rest api", "graphql", "microservices", "ci/cd",
+    "agile", "scrum", "jira", "confluence",
+})
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Build a regex alternation shaped like a prefix trie.
+
+    Python's regex engine tries alternatives one by one, so a flat
+    `a|b|c|...` costs O(phrases) at every text position. Factoring out
+    shared prefixes makes each attempt O(phrase length) instead.
+    """
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End-of-phrase marker
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Phrase may end here; the greedy `?` still prefers the longer match
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    return build(trie)
+
+
+class SkillExtractor:
+    """
+    Find every phrase of a taxonomy in a text in a single pass.
+
+    Phrases match case-insensitively on word boundaries. All phrases are
+    compiled into one trie-shaped regex, so extraction cost grows with the
+    text length rather than with text length x taxonomy size.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        """Compile the taxonomy."""
+        self.phrases = frozenset(p.lower() for p in phrases if p)
+
+        # A zero-width lookahead lets matches overlap ("rest api" and "api design")
+        self._pattern = re.compile(
+            r"(?<!\w)(?=(" + _trie_pattern(sorted(self.phrases)) + r")(?!\w))",
+            re.IGNORECASE
+        )
+
+        # Only the longest phrase is reported per start position, so record
+        # shorter phrases that are word-bounded prefixes ("spring" in "spring boot")
+        self._prefixes: Dict[str, List[str]] = {}
+        for phrase in self.phrases:
+            prefixes = [
+                phrase[:end] for end in range(1, len(phrase))
+                if phrase[:end] in self.phrases and not _WORD_CHAR.match(phrase[end])
+            ]
+            if prefixes:
+                self._prefixes[phrase] = prefixes
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Extract phrases found in text.
+
+        Returns:
+            Sorted list of unique lower-case phrases
+        """
+        if not text:
+            return []
+
+        found = set()
+        for match in self._pattern.finditer(text):
+            phrase = match.group(1).lower()
+            found.add(phrase)
+            found.update(self._prefixes.get(phrase, ()))
+
+        return sorted(found)
+
+    def extract_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """Extract phrases from many texts."""
+        return [self.extract(text) for text in texts]
+
+
+# Singleton instance
+skill_extractor = SkillExtractor(TECH_SKILLS)
@@ -0,0 +1,27 @@
+"""Warm-up hooks for the lazily loaded ML services."""
+
+
+def preload_models():
+    """
+    Load ML models without opening any network connections.
+
+    Safe to call in a parent process before forking workers: the loaded
+    weights are then shared copy-on-write by every child.
+    """
+    from app.ml.embeddings import embedding_service
+    from app.services.resume_parser import resume_parser
+
+    embedding_service.load_model()
+    resume_parser.warm_up()
+
+
+def warm_up_services():
+    """Load models and connect clients so the first request is fast."""
+    from app.ml.embeddings import embedding_service
+    from app.services.resume_parser import resume_parser
+
+    for name, service in (("embeddings", embedding_service), ("resume parser", resume_parser)):
+        try:
+            service.warm_up()
+        except Exception as e:
+            print(f"⚠️ Warm-up failed for {name}: {e}")
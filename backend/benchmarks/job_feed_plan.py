@@ -0,0 +1,60 @@
+"""
+Show Postgres plans for GET /api/jobs keyset pages.
+
+Runs EXPLAIN (ANALYZE, BUFFERS) against DATABASE_URL for the page after a
+cursor, comparing the old single query (dated rows after the cursor OR any
+undated row) with the two range seeks list_jobs now issues. Each seek
+should be an Index Scan on ix_jobs_feed_order with the cursor in its
+Index Cond and no Sort node.
+
+Usage (from backend/, against a database with jobs in it):
+    python -m benchmarks.job_feed_plan
+"""
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.dialects import postgresql
+
+from app.database import SessionLocal
+from app.models.job import Job
+
+
+def feed_page(*conditions):
+    """The list_jobs page query (no search) with extra conditions."""
+    return select(
+        Job.id, Job.title, Job.company, Job.location, Job.job_type,
+        Job.experience_level, Job.posted_date, Job.job_url, Job.source
+    ).where(
+        Job.is_active == True, Job.canonical_job_id == None, *conditions
+    ).order_by(Job.posted_date.desc().nulls_last(), Job.id.desc()).limit(20)
+
+
+def explain(db, label, query):
+    compiled = query.compile(dialect=postgresql.dialect())
+    plan = db.connection().exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS) {compiled}", compiled.params
+    ).scalars().all()
+    print(f"-- {label}")
+    print("\n".join(plan))
+    print()
+
+
+def main():
+    db = SessionLocal()
+    try:
+        # Cursor in the middle of the dated rows
+        cursor = db.execute(
+            feed_page(Job.posted_date != None).with_only_columns(Job.posted_date, Job.id).offset(1000)
+        ).first()
+        if cursor is None:
+            print("Need more than 1000 dated jobs to show a mid-feed cursor")
+            return
+        after = tuple_(Job.posted_date, Job.id) < tuple_(*cursor)
+
+        explain(db, "old: dated after cursor OR undated", feed_page(or_(after, Job.posted_date == None)))
+        explain(db, "dated rows after the cursor", feed_page(after))
+        explain(db, "undated top-up", feed_page(Job.posted_date == None))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark JobValidator throughput (jobs/sec).
+
+Compares the original per-job checks (substring loop over SPAM_KEYWORDS,
+uncompiled RED_FLAGS searches, dateutil for every date string) with the
+precompiled validator, in-process and through validate_jobs' process pool.
+
+Usage (from backend/):
+    python -m benchmarks.job_validation
+"""
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from app.services.job_validator import JobValidator
+
+
+def legacy_validate(job_data):
+    """Original validate_job hot path."""
+    warnings = []
+    is_spam = False
+
+    description = (job_data.get('description', '') + ' ' +
+                   job_data.get('title', '')).lower()
+
+    for keyword in JobValidator.SPAM_KEYWORDS:
+        if keyword in description:
+            is_spam = True
+            warnings.append(f"Spam keyword detected: {keyword}")
+
+    for pattern in JobValidator.RED_FLAGS:
+        if re.search(pattern, description, re.IGNORECASE):
+            is_spam = True
+            warnings.append("Suspicious pattern detected")
+
+    posted_date = job_data.get('posted_date')
+    age_days = None
+    if isinstance(posted_date, str):
+        from dateutil import parser
+        age_days = (datetime.now() - parser.parse(posted_date)).days
+
+    return {"is_spam": is_spam, "warnings": warnings, "age_days": age_days}
+
+
+def make_jobs(count, rng):
+    """Synthetic postings: ~2 KB descriptions, ISO date strings, a few spam."""
+    filler = ["we", "are", "hiring", "a", "backend", "engineer", "to", "build",
+              "services", "with", "python", "and", "postgres", "on", "our", "team"]
+    now = datetime.now()
+    jobs = []
+    for i in range(count):
+        words = [rng.choice(filler) for _ in range(300)]
+        if i % 50 == 0:
+            words.append("easy money wire transfer")
+        jobs.append({
+            "title": "Software Engineer",
+            "company": "Acme",
+            "description": " ".join(words),
+            "posted_date": (now - timedelta(days=rng.randint(0, 120))).isoformat(),
+        })
+    return jobs
+
+
+def rate(func, jobs):
+    start = time.perf_counter()
+    func(jobs)
+    return len(jobs) / (time.perf_counter() - start)
+
+
+def main():
+    rng = random.Random(42)
+    validator = JobValidator()
+
+    print(f"{'jobs':>7} {'legacy/s':>10} {'compiled/s':>11} {'pool(4)/s':>10} {'speedup':>8}")
+    for count in (1000, 10000, 50000):
+        jobs = make_jobs(count, rng)
+
+        legacy = rate(lambda batch: [legacy_validate(job) for job in batch], jobs)
+        compiled = rate(lambda batch: validator.validate_jobs(batch, workers=0), jobs)
+        pooled = rate(lambda batch: validator.validate_jobs(batch, workers=4), jobs)
+        print(f"{count:>7} {legacy:>10.0f} {compiled:>11.0f} {pooled:>10.0f} {compiled / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark skill extraction throughput as the taxonomy grows.
+
+Compares the old approach (one `\\b...\\b` regex per skill) with the shared
+single-pass SkillExtractor on a large job description.
+
+Usage (from backend/):
+    python -m benchmarks.skill_extraction
+"""
+import random
+import re
+import string
+import time
+
+from app.services.skill_extractor import TECH_SKILLS, SkillExtractor
+
+
+def legacy_extract(skills, text):
+    """Previous implementation: one regex search per skill."""
+    text_lower = text.lower()
+    found = []
+    for skill in skills:
+        pattern = r'\b' + re.escape(skill) + r'\b'
+        if re.search(pattern, text_lower):
+            found.append(skill)
+    return found
+
+
+def make_taxonomy(size, rng):
+    """Real skills padded with random synthetic ones."""
+    skills = set(TECH_SKILLS)
+    while len(skills) < size:
+        words = rng.randint(1, 3)
+        skills.add(" ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+            for _ in range(words)
+        ))
+    return sorted(skills)
+
+
+def make_description(skills, words, rng):
+    """Filler text with some taxonomy phrases mixed in."""
+    filler = ["the", "team", "build", "scalable", "services", "with", "and",
+              "experience", "in", "our", "platform", "customers", "data"]
+    tokens = [rng.choice(filler) for _ in range(words)]
+    for i in range(0, words, 25):
+        tokens[i] = rng.choice(skills)
+    return " ".join(tokens)
+
+
+def time_it(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'skills':>8} {'text KB':>8} {'legacy ms':>10} {'single-pass ms':>15} {'speedup':>8} {'MB/s':>7}")
+
+    for size in (75, 500, 2000, 5000):
+        skills = make_taxonomy(size, rng)
+        text = make_description(skills, 20000, rng)
+        extractor = SkillExtractor(skills)
+
+        assert set(legacy_extract(skills, text)) <= set(extractor.extract(text))
+
+        legacy = time_it(lambda: legacy_extract(skills, text), repeat=3)
+        single = time_it(lambda: extractor.extract(text), repeat=10)
+        print(
+            f"{size:>8} {len(text) / 1024:>8.0f} {legacy * 1000:>10.1f} "
+            f"{single * 1000:>15.2f} {legacy / single:>7.0f}x {len(text) / single / 1e6:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Shared test fixtures."""
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401 - registers every table on Base.metadata
+from app.database import Base
+from app.services.response_cache import response_cache
+
+
+class QueryCounter:
+    """Count SQL statements sent to the database."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+@pytest_asyncio.fixture
+async def engine():
+    """In-memory SQLite engine with the full schema."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(engine):
+    """Async session bound to the test engine."""
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+
+
+@pytest.fixture
+def query_counter(engine):
+    """Counts statements on engine; reset .count before the code under test."""
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache():
+    """Keep Redis out of endpoint tests."""
+    enabled = response_cache.enabled
+    response_cache.enabled = False
+    yield
+    response_cache.enabled = enabled
@@ -0,0 +1,58 @@
+"""Streaming validation in the AI job discovery pipeline."""
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from app.config import settings
+from app.services.ai_job_discovery import AIJobDiscovery
+
+
+def make_jobs(count):
+    return [
+        {
+            "external_id": f"job-{i}",
+            "title": f"Backend Engineer {i}",
+            "company": f"Company {i}",
+            "location": "Remote",
+            "description": "Build and operate Python services with PostgreSQL and Redis. " * 5,
+            "url": f"https://example.com/jobs/{i}",
+            "posted_date": datetime.utcnow(),
+            "source": "indeed",
+        }
+        for i in range(count)
+    ]
+
+
+def test_validate_stream_uses_batched_validate_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "VALIDATE_WORKERS", 0)
+    monkeypatch.setattr(settings, "VALIDATE_CHUNK_SIZE", 2)
+    discovery = AIJobDiscovery(db=None)
+    batch_sizes = []
+    validate_jobs = discovery.validator.validate_jobs
+
+    def record(jobs, workers=None):
+        batch_sizes.append(len(jobs))
+        return validate_jobs(jobs, workers)
+
+    monkeypatch.setattr(discovery.validator, "validate_jobs", record)
+
+    jobs = make_jobs(5)
+    list(discovery._validate_stream(iter(jobs), 14, Counter()))
+
+    assert batch_sizes == [2, 2, 1]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_validate_stream_results_match_validate_job(monkeypatch, workers):
+    monkeypatch.setattr(settings, "VALIDATE_WORKERS", workers)
+    monkeypatch.setattr(settings, "VALIDATE_PARALLEL_MIN_JOBS", 4)
+    monkeypatch.setattr(settings, "VALIDATE_CHUNK_SIZE", 2)
+    discovery = AIJobDiscovery(db=None)
+
+    passed = list(discovery._validate_stream(iter(make_jobs(6)), 14, Counter()))
+
+    # With workers=2 the first batch of 4 is validated in the process pool
+    assert [job["validation"] for job in passed] == [
+        discovery.validator.validate_job(job) for job in make_jobs(6)
+    ]
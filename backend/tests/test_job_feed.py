@@ -0,0 +1,57 @@
+"""Keyset pagination of the job feed."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.jobs import list_jobs
+from app.models.job import Job
+
+
+async def seed(db, dated: int, undated: int):
+    """Jobs with distinct and shared posted dates, plus undated ones."""
+    now = datetime(2026, 1, 1)
+    db.add_all([
+        Job(
+            external_id=f"job-{i}",
+            title=f"Engineer {i}",
+            company=f"Company {i}",
+            description="Build things",
+            job_url=f"https://example.com/jobs/{i}",
+            source="indeed",
+            is_active=True,
+            posted_date=now - timedelta(days=i // 2) if i < dated else None,
+        )
+        for i in range(dated + undated)
+    ])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [1, 3, 4, 10])
+async def test_cursor_pages_cover_feed_in_order(db, limit):
+    await seed(db, dated=7, undated=5)
+    offset_order = [job["id"] for job in (await list_jobs(skip=0, limit=100, db=db))["jobs"]]
+
+    ids, cursor = [], None
+    while True:
+        page = await list_jobs(cursor=cursor, skip=0, limit=limit, db=db)
+        ids += [job["id"] for job in page["jobs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(offset_order) == 12
+    assert ids == offset_order
+
+
+@pytest.mark.asyncio
+async def test_page_ending_on_dated_jobs_tops_up_with_undated(db, query_counter):
+    await seed(db, dated=3, undated=5)
+    first = await list_jobs(skip=0, limit=2, db=db)
+    query_counter.count = 0
+
+    page = await list_jobs(cursor=first["next_cursor"], skip=0, limit=4, db=db)
+
+    assert [job["posted_date"] is None for job in page["jobs"]] == [False, True, True, True]
+    # Count, dated rows after the cursor, undated top-up
+    assert query_counter.count == 3
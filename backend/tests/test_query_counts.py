@@ -0,0 +1,86 @@
+"""Listing endpoints must issue a constant number of queries (no N+1)."""
+import pytest
+
+from app.api.applications import get_application, list_applications
+from app.api.matching import get_matches_for_resume
+from app.models.application import Application
+from app.models.job import Job
+from app.models.match_score import MatchScore
+from app.models.resume import Resume
+from app.models.user import User
+
+ROW_COUNTS = [1, 25]
+
+
+async def seed(db, rows: int):
+    """A user with one resume, and rows jobs each applied to and scored."""
+    user = User(email="user@example.com", hashed_password="x")
+    db.add(user)
+    await db.flush()
+
+    resume = Resume(user_id=user.id, filename="resume.pdf", file_path="/tmp/resume.pdf", raw_text="python")
+    db.add(resume)
+
+    jobs = [
+        Job(
+            external_id=f"job-{i}",
+            title=f"Engineer {i}",
+            company=f"Company {i}",
+            location="Remote",
+            description="Build things with python",
+            job_url=f"https://example.com/jobs/{i}",
+            source="indeed",
+        )
+        for i in range(rows)
+    ]
+    db.add_all(jobs)
+    await db.flush()
+
+    applications = [Application(user_id=user.id, job_id=job.id, status="pending") for job in jobs]
+    db.add_all(applications)
+    db.add_all([
+        MatchScore(resume_id=resume.id, job_id=job.id, overall_score=50 + i, matched_skills=["python"])
+        for i, job in enumerate(jobs)
+    ])
+    await db.commit()
+    return resume, applications
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+async def test_list_applications_query_count(db, query_counter, rows):
+    await seed(db, rows)
+    query_counter.count = 0
+
+    result = await list_applications(db=db)
+
+    assert result["total"] == rows
+    assert query_counter.count == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+async def test_get_application_query_count(db, query_counter, rows):
+    _, applications = await seed(db, rows)
+    query_counter.count = 0
+
+    result = await get_application(applications[-1].id, db=db)
+
+    assert result["job_title"] == f"Engineer {rows - 1}"
+    assert query_counter.count == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+async def test_get_matches_for_resume_query_count(db, query_counter, rows):
+    resume, _ = await seed(db, rows)
+    query_counter.count = 0
+
+    result = await get_matches_for_resume(resume.id, min_score=0, limit=100, db=db)
+
+    assert result["total"] == rows
+    assert [match["overall_score"] for match in result["matches"]] == sorted(
+        (match["overall_score"] for match in result["matches"]), reverse=True
+    )
+    # Resume existence check plus one joined query
+    assert query_counter.count == 2
@@ -0,0 +1,118 @@
+"""ResponseCache generation handling."""
+import asyncio
+
+import pytest
+
+from app.services.response_cache import (
+    ResponseCache,
+    commit_and_invalidate,
+    invalidate_matches,
+    response_cache,
+)
+
+
+class FakeRedis:
+    """Just the commands ResponseCache uses, on a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.ops = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def incr(self, key):
+        self.ops.append(key)
+
+    def execute(self):
+        for key in self.ops:
+            self.data[key] = int(self.data.get(key) or 0) + 1
+        self.ops = []
+
+
+class FakeAsyncRedis(FakeRedis):
+    """FakeRedis whose pipeline executes like redis.asyncio's."""
+
+    async def execute(self):
+        super().execute()
+
+
+def fake_clients(cache):
+    """Async and sync fakes over the same data, like two clients of one server."""
+    cache._async_client, cache._sync_client = FakeAsyncRedis(), FakeRedis()
+    cache._sync_client.data = cache._async_client.data
+    return cache
+
+
+@pytest.fixture
+def cache():
+    return fake_clients(ResponseCache(enabled=True))
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """The module-level cache the session hooks use, on fake clients."""
+    monkeypatch.setattr(response_cache, "enabled", True)
+    monkeypatch.setattr(response_cache, "_async_client", None)
+    monkeypatch.setattr(response_cache, "_sync_client", None)
+    fake_clients(response_cache)
+    response_cache._sync_client.pipeline = None  # the event loop must not use it
+    return response_cache
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_cached_response(cache):
+    _, generation = await cache.get("job", {}, scope=1)
+    await cache.set("job", {}, {"title": "old"}, 60, scope=1, generation=generation)
+    assert (await cache.get("job", {}, scope=1))[0] == {"title": "old"}
+
+    cache.invalidate("job", [1])
+
+    assert (await cache.get("job", {}, scope=1))[0] is None
+
+
+@pytest.mark.asyncio
+async def test_response_computed_before_invalidation_is_not_served(cache):
+    # A reader misses and queries the database...
+    _, generation = await cache.get("job", {}, scope=1)
+    # ...a writer commits and invalidates before the reader stores
+    cache.invalidate("job", [1])
+    await cache.set("job", {}, {"title": "stale"}, 60, scope=1, generation=generation)
+
+    assert (await cache.get("job", {}, scope=1))[0] is None
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_does_not_store(cache):
+    cache.async_client.get = None  # any read raises
+    cached, generation = await cache.get("jobs", {})
+    assert (cached, generation) == (None, None)
+
+    cache._async_client = FakeAsyncRedis()
+    await cache.set("jobs", {}, {"total": 1}, 60, generation=generation)
+    assert cache.async_client.data == {}
+
+
+@pytest.mark.asyncio
+async def test_commit_and_invalidate_uses_async_client(db, shared_cache):
+    invalidate_matches(db.sync_session, [7])
+
+    await commit_and_invalidate(db)
+
+    assert shared_cache.async_client.data == {"rc:gen:matches:7": 1}
+
+
+@pytest.mark.asyncio
+async def test_plain_async_commit_does_not_block_on_sync_client(db, shared_cache):
+    invalidate_matches(db.sync_session, [7])
+
+    await db.commit()
+    await asyncio.sleep(0)
+
+    assert shared_cache.async_client.data == {"rc:gen:matches:7": 1}
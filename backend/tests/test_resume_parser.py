@@ -0,0 +1,77 @@
+"""pyresparser fallback stage of the resume parser."""
+import os
+import time
+
+import pytest
+from billiard.pool import Pool
+
+from app.config import settings
+from app.services import resume_parser as parser_module
+from app.services.resume_parser import resume_parser
+
+# Stand-in for pyresparser: hangs on files named hang*, fails on fail*
+FAKE_PYRESPARSER = '''
+import os
+
+class ResumeParser:
+    def __init__(self, path):
+        self.path = path
+
+    def get_extracted_data(self):
+        name = os.path.basename(self.path)
+        if name.startswith("hang"):
+            while True:
+                pass
+        if name.startswith("fail"):
+            raise ValueError("unreadable resume")
+        print("noise from the NLP stack")
+        return {"name": "Jane Doe", "email": "jane@example.com", "mobile_number": "555-0100"}
+'''
+
+
+def run_in_worker(file_path):
+    """Billiard pool task: the stage as process_resume_task runs it."""
+    return resume_parser._run_pyresparser(file_path)
+
+
+@pytest.fixture
+def fake_pyresparser(tmp_path, monkeypatch):
+    """Install the stand-in for this process and its subprocesses."""
+    package = tmp_path / "site" / "pyresparser"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text(FAKE_PYRESPARSER)
+
+    site = str(tmp_path / "site")
+    monkeypatch.syspath_prepend(site)
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [site, os.environ.get("PYTHONPATH")])))
+    monkeypatch.setattr(parser_module, "_pyresparser_found", None)
+    monkeypatch.setattr(settings, "PYRESPARSER_TIMEOUT_SECONDS", 2)
+    return tmp_path
+
+
+def resume_file(directory, name):
+    path = directory / name
+    path.write_text("Jane Doe\njane@example.com")
+    return str(path)
+
+
+def test_pyresparser_runs_inside_daemonic_pool_worker(fake_pyresparser):
+    # Celery's prefork workers are daemonic billiard processes
+    pool = Pool(1)
+    try:
+        result = pool.apply(run_in_worker, (resume_file(fake_pyresparser, "resume.txt"),))
+    finally:
+        pool.terminate()
+
+    assert result == {"name": "Jane Doe", "email": "jane@example.com", "mobile_number": "555-0100"}
+
+
+def test_pyresparser_timeout_kills_the_run(fake_pyresparser):
+    start = time.perf_counter()
+
+    assert resume_parser._run_pyresparser(resume_file(fake_pyresparser, "hang.txt")) == {}
+    assert time.perf_counter() - start < settings.PYRESPARSER_TIMEOUT_SECONDS + 3
+
+
+def test_pyresparser_failure_falls_back(fake_pyresparser):
+    assert resume_parser._run_pyresparser(resume_file(fake_pyresparser, "fail.txt")) == {}
@@ -3,6 +3,23 @@ import { useDropzone } from 'react-dropzone'
 import { CloudArrowUpIcon, DocumentTextIcon, CheckCircleIcon } from '@heroicons/react/24/outline'
 import axios from 'axios'
 
+const POLL_INTERVAL_MS = 1000
+const POLL_TIMEOUT_MS = 120000
+
+async function waitForTask(taskId) {
+  // Unknown or expired task ids stay "queued" forever, so give up eventually
+  const deadline = Date.now() + POLL_TIMEOUT_MS
+  while (Date.now() < deadline) {
+    const { data } = await axios.get(`/api/resumes/tasks/${taskId}`)
+    if (data.status === 'completed') return data.result
+    if (data.status === 'failed') {
+      throw { response: { data: { detail: data.error || 'Failed to process resume' } } }
+    }
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS))
+  }
+  throw { response: { data: { detail: 'Resume processing timed out. Please try again.' } } }
+}
+
 export default function ResumeUpload() {
   const [uploading, setUploading] = useState(false)
   const [uploaded, setUploaded] = useState(false)
@@ -24,7 +41,12 @@ export default function ResumeUpload() {
         headers: { 'Content-Type': 'multipart/form-data' }
       })
 
-      setResumeData(response.data)
+      // Parsing runs in the background - poll until it finishes
+      const result = response.data.status === 'completed'
+        ? response.data.result
+        : await waitForTask(response.data.task_id)
+
+      setResumeData(result)
       setUploaded(true)
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to upload resume')